@@ -0,0 +1,158 @@
+import argparse
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+KEY_PATTERN = re.compile(r'^/v1/cache/([0-9a-f]{64})$')
+# Ruang tambahan untuk pembungkus JSON ({"value": ..., "ttl": ...}) di atas batas ukuran nilai
+PAYLOAD_OVERHEAD_BYTES = 1024
+
+class LLMResultCache:
+    """Penyimpanan hasil LLM di memori dengan TTL, batas jumlah entri, dan batas total ukuran (LRU)."""
+
+    def __init__(self, max_entries=10000, max_bytes=64 * 1024 * 1024, max_ttl=30 * 24 * 3600):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_ttl = max_ttl
+        self.entries = OrderedDict()  # key -> (expires_at, value)
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """Mengambil nilai jika ada dan belum kedaluwarsa."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                self._remove(key)
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value, ttl):
+        """Menyimpan nilai dan membuang entri terlama jika batas terlampaui."""
+        size = len(value.encode('utf-8'))
+        if size > self.max_bytes:
+            return False
+        ttl = min(ttl or self.max_ttl, self.max_ttl)
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (time.time() + ttl, value)
+            self.total_bytes += size
+            while len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                oldest_key = next(iter(self.entries))
+                self._remove(oldest_key)
+        return True
+
+    def stats(self):
+        """Mengembalikan jumlah entri dan total ukuran cache."""
+        with self.lock:
+            return {'entries': len(self.entries), 'bytes': self.total_bytes}
+
+    def _remove(self, key):
+        _, value = self.entries.pop(key)
+        self.total_bytes -= len(value.encode('utf-8'))
+
+def make_handler(cache, token=None):
+    """Membuat handler HTTP yang melayani GET/PUT /v1/cache/<sha256> dan GET /health."""
+
+    class CacheRequestHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _authorized(self):
+            if token and self.headers.get('X-Cache-Token') != token:
+                self._send_json(401, {'error': 'unauthorized'})
+                return False
+            return True
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._send_json(200, cache.stats())
+                return
+            match = KEY_PATTERN.match(self.path)
+            if not match:
+                self._send_json(404, {'error': 'not found'})
+                return
+            if not self._authorized():
+                return
+            value = cache.get(match.group(1))
+            if value is None:
+                self._send_json(404, {'error': 'miss'})
+            else:
+                self._send_json(200, {'value': value})
+
+        def do_PUT(self):
+            match = KEY_PATTERN.match(self.path)
+            if not match:
+                self._send_json(404, {'error': 'not found'})
+                return
+            if not self._authorized():
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+            except ValueError:
+                self._send_json(400, {'error': 'invalid content length'})
+                return
+            # Body yang terlalu besar ditolak sebelum dibaca ke memori
+            if length < 0 or length > cache.max_bytes + PAYLOAD_OVERHEAD_BYTES:
+                self._send_json(413, {'error': 'value too large'})
+                return
+            try:
+                payload = json.loads(self.rfile.read(length).decode('utf-8'))
+                value = payload['value']
+                ttl = payload.get('ttl')
+            except (ValueError, KeyError, TypeError, AttributeError):
+                self._send_json(400, {'error': 'invalid payload'})
+                return
+            if not isinstance(value, str):
+                self._send_json(400, {'error': 'value must be a string'})
+                return
+            if ttl is not None and (not isinstance(ttl, int) or isinstance(ttl, bool) or ttl <= 0):
+                self._send_json(400, {'error': 'ttl must be a positive integer'})
+                return
+            if not cache.put(match.group(1), value, ttl):
+                self._send_json(413, {'error': 'value too large'})
+                return
+            self._send_json(201, {'stored': True})
+
+        def log_message(self, format, *args):
+            # Cukup tampilkan request secara ringkas
+            print(f"{self.address_string()} {format % args}")
+
+    return CacheRequestHandler
+
+def main():
+    """Menjalankan server cache LLM lokal untuk tim atau untuk pengujian offline."""
+    parser = argparse.ArgumentParser(description="Server cache hasil LLM untuk Git ACPR Automatic Helper.")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Alamat bind server. Default: 127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765, help="Port server. Default: 8765")
+    parser.add_argument("--max-entries", type=int, default=10000, help="Jumlah entri maksimal. Default: 10000")
+    parser.add_argument("--max-mb", type=int, default=64, help="Total ukuran cache maksimal (MB). Default: 64")
+    parser.add_argument("--max-ttl", type=int, default=30 * 24 * 3600, help="TTL maksimal per entri (detik). Default: 30 hari")
+    parser.add_argument("--token", type=str, default=None, help="Token yang wajib dikirim client lewat header X-Cache-Token.")
+    args = parser.parse_args()
+
+    cache = LLMResultCache(args.max_entries, args.max_mb * 1024 * 1024, args.max_ttl)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(cache, args.token))
+    print(f"✅ Server cache LLM berjalan di http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nServer cache dihentikan.")
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
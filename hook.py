@@ -0,0 +1,252 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+from lib import config, diff_model, git_utils, local_commit, repo_profile
+
+HOOK_NAME = 'prepare-commit-msg'
+HOOK_MARKER = '# Dipasang oleh git-acpr-auto (hook.py --install)'
+STATS_FILENAME = 'acpr_hook_stats.jsonl'
+# Sumber pesan yang berarti pengguna/git sudah menyediakan pesan; hook tidak menimpanya
+SKIPPED_SOURCES = ('message', 'template', 'merge', 'squash', 'commit')
+
+def get_hooks_dir():
+    """Mendapatkan direktori hooks Git (menghormati core.hooksPath)."""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--git-path", "hooks"],
+            capture_output=True, text=True, check=True
+        )
+        return os.path.abspath(result.stdout.strip())
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+
+def install_hook(force=False):
+    """Memasang hook prepare-commit-msg yang memanggil script ini."""
+    hooks_dir = get_hooks_dir()
+    if not hooks_dir:
+        print("❌ Error: Direktori saat ini bukan repository Git.")
+        return False
+
+    hook_path = os.path.join(hooks_dir, HOOK_NAME)
+    if os.path.exists(hook_path) and not force:
+        with open(hook_path, 'r', encoding='utf-8', errors='replace') as f:
+            if HOOK_MARKER not in f.read():
+                print(f"❌ Hook '{hook_path}' sudah ada dan bukan milik git-acpr-auto. Gunakan --force untuk menimpa.")
+                return False
+
+    script_path = os.path.abspath(__file__)
+    content = (
+        "#!/bin/sh\n"
+        f"{HOOK_MARKER}\n"
+        f"\"{sys.executable}\" \"{script_path}\" \"$@\"\n"
+        "# Hook tidak boleh menggagalkan commit\n"
+        "exit 0\n"
+    )
+    os.makedirs(hooks_dir, exist_ok=True)
+    with open(hook_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.chmod(hook_path, 0o755)
+    print(f"✅ Hook {HOOK_NAME} dipasang di: {hook_path}")
+    return True
+
+def uninstall_hook():
+    """Menghapus hook prepare-commit-msg jika dipasang oleh script ini."""
+    hooks_dir = get_hooks_dir()
+    hook_path = os.path.join(hooks_dir, HOOK_NAME) if hooks_dir else None
+    if not hook_path or not os.path.exists(hook_path):
+        print("ℹ️ Hook tidak terpasang.")
+        return True
+    with open(hook_path, 'r', encoding='utf-8', errors='replace') as f:
+        if HOOK_MARKER not in f.read():
+            print(f"❌ Hook '{hook_path}' bukan milik git-acpr-auto, tidak dihapus.")
+            return False
+    os.remove(hook_path)
+    print(f"✅ Hook {HOOK_NAME} dihapus.")
+    return True
+
+def get_stats_path():
+    """Mendapatkan path file statistik waktu eksekusi hook di dalam direktori .git."""
+    git_dir = git_utils.get_git_dir()
+    return os.path.join(git_dir, STATS_FILENAME) if git_dir else None
+
+def record_hook_stats(entry):
+    """Menambahkan satu baris statistik eksekusi hook (JSON Lines)."""
+    stats_path = get_stats_path()
+    if not stats_path:
+        return
+    try:
+        with open(stats_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + "\n")
+    except OSError:
+        pass
+
+def print_hook_stats():
+    """Menampilkan ringkasan waktu eksekusi hook: jumlah per sumber, p50, p95, dan maksimum."""
+    stats_path = get_stats_path()
+    if not stats_path or not os.path.exists(stats_path):
+        print("ℹ️ Belum ada statistik hook.")
+        return
+
+    entries = []
+    with open(stats_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+    if not entries:
+        print("ℹ️ Belum ada statistik hook.")
+        return
+
+    durations = sorted(e['elapsed_ms'] for e in entries)
+
+    def percentile(p):
+        return durations[min(len(durations) - 1, int(round(p / 100 * (len(durations) - 1))))]
+
+    sources = {}
+    for e in entries:
+        sources[e['source']] = sources.get(e['source'], 0) + 1
+    over_budget = sum(1 for e in entries if e['elapsed_ms'] > e.get('budget_ms', float('inf')))
+
+    print(f"📊 Statistik hook {HOOK_NAME} ({len(entries)} eksekusi)")
+    print(f"   p50: {percentile(50):.0f} ms | p95: {percentile(95):.0f} ms | max: {durations[-1]:.0f} ms")
+    print(f"   Melewati budget: {over_budget}")
+    print("   Sumber pesan: " + ", ".join(f"{name}={count}" for name, count in sorted(sources.items())))
+
+def remaining_time(deadline):
+    """Sisa waktu (detik) sebelum deadline hook."""
+    return deadline - time.monotonic()
+
+def set_cache_timeout(ai_utils, configured_timeout, deadline):
+    """Membatasi timeout request cache dengan sisa waktu hook. Mengembalikan False jika waktu habis."""
+    remaining = remaining_time(deadline)
+    if remaining <= 0:
+        return False
+    ai_utils.CACHE_SETTINGS['timeout'] = min(configured_timeout, remaining)
+    return True
+
+def generate_hook_message(diff, app_config, deadline):
+    """
+    Membuat pesan commit dalam batas waktu: cache bersama, lalu model, lalu generator lokal.
+    Deadline dicek sebelum setiap langkah yang bisa lambat. Mengembalikan tuple (pesan, sumber).
+    """
+    model_name = app_config.get('hook-model') or app_config.get('model', 'gemini-1.5-flash-latest')
+    use_profile = app_config.get('repo-profile', 'true').lower() == 'true'
+
+    # Hook tidak pernah membangun profil dari `git log`; hanya memakai profil yang sudah ada di cache
+    profile = repo_profile.load_repo_profile(cached_only=True) if use_profile else None
+    changed_paths = diff.paths()
+    scope = repo_profile.suggest_scope(profile, changed_paths)
+    repo_hint = repo_profile.build_prompt_hint(profile, changed_paths)
+
+    message, source = None, None
+    try:
+        if remaining_time(deadline) <= 0:
+            raise TimeoutError
+        # Import ditunda karena memuat library Gemini relatif lambat
+        from lib import ai_utils
+
+        ai_utils.configure_cache(
+            app_config.get('cache-url'),
+            ttl=app_config.get('cache-ttl'),
+            timeout=app_config.get('cache-timeout'),
+            token=app_config.get('cache-token'),
+        )
+        configured_timeout = ai_utils.CACHE_SETTINGS['timeout']
+        use_cache = bool(ai_utils.CACHE_SETTINGS['url'])
+        if use_cache and set_cache_timeout(ai_utils, configured_timeout, deadline):
+            message = ai_utils.get_cached_commit_message(diff, model_name, repo_hint)
+            source = 'cache' if message else None
+
+        remaining = remaining_time(deadline)
+        if not message and remaining > 0:
+            config.configure_api()
+            # Cache sudah dicek di atas; generate_commit_message tidak boleh mengulang GET
+            message = ai_utils.generate_commit_message(
+                diff, model_name, timeout=remaining, repo_hint=repo_hint, use_cache=False
+            )
+            source = 'model' if message else None
+            if message and use_cache and set_cache_timeout(ai_utils, configured_timeout, deadline):
+                ai_utils.put_cached_commit_message(diff, model_name, message, repo_hint)
+    except Exception:
+        # Waktu habis, library tidak tersedia, API key tidak ada, atau error jaringan: gunakan fallback lokal
+        message = None
+
+    if not message:
+        message, source = local_commit.generate_local_commit_message(diff), 'local'
+    return repo_profile.apply_scope(message, scope), source
+
+def write_message_file(message_file, message):
+    """Menulis pesan di awal file pesan commit, mempertahankan komentar bawaan Git."""
+    with open(message_file, 'r', encoding='utf-8') as f:
+        existing = f.read()
+    with open(message_file, 'w', encoding='utf-8') as f:
+        f.write(f"{message}\n{existing}")
+
+def run_hook(message_file, source, app_config):
+    """Menjalankan hook prepare-commit-msg dengan batas waktu dari konfigurasi."""
+    if source in SKIPPED_SOURCES:
+        return
+
+    started = time.monotonic()
+    budget = float(app_config.get('hook-timeout', 5))
+
+    # Pesan internal modul lain tidak ditampilkan agar output `git commit` tetap bersih
+    with contextlib.redirect_stdout(io.StringIO()):
+        diff = diff_model.parse_diff(git_utils.get_git_diff())
+        if not diff:
+            return
+        message, message_source = generate_hook_message(diff, app_config, started + budget)
+
+    if message:
+        write_message_file(message_file, message)
+
+    elapsed_ms = (time.monotonic() - started) * 1000
+    record_hook_stats({
+        'timestamp': time.time(),
+        'source': message_source if message else 'none',
+        'elapsed_ms': round(elapsed_ms, 1),
+        'budget_ms': budget * 1000,
+        'diff_bytes': len(diff),
+    })
+    print(f"ℹ️ git-acpr-auto: pesan commit dari {message_source} ({elapsed_ms:.0f} ms)", file=sys.stderr)
+
+def main():
+    """Entry point hook prepare-commit-msg, installer, dan statistik."""
+    parser = argparse.ArgumentParser(description=f"Hook Git {HOOK_NAME} untuk Git ACPR Automatic Helper.")
+    parser.add_argument("message_file", nargs="?", help="File pesan commit (diberikan oleh Git).")
+    parser.add_argument("source", nargs="?", default="", help="Sumber pesan commit (diberikan oleh Git).")
+    parser.add_argument("commit_sha", nargs="?", default="", help="SHA commit untuk amend (diberikan oleh Git).")
+    parser.add_argument("-c", "--config", default="conf/git_acp.conf", help="Path ke file konfigurasi. (Default: conf/git_acp.conf)")
+    parser.add_argument("--install", action="store_true", help=f"Pasang hook {HOOK_NAME} di repository saat ini.")
+    parser.add_argument("--uninstall", action="store_true", help=f"Hapus hook {HOOK_NAME} dari repository saat ini.")
+    parser.add_argument("--force", action="store_true", help="Timpa hook yang sudah ada saat --install.")
+    parser.add_argument("--stats", action="store_true", help="Tampilkan statistik waktu eksekusi hook.")
+    args = parser.parse_args()
+
+    if args.install:
+        sys.exit(0 if install_hook(args.force) else 1)
+    if args.uninstall:
+        sys.exit(0 if uninstall_hook() else 1)
+    if args.stats:
+        print_hook_stats()
+        return
+    if not args.message_file:
+        parser.print_help()
+        return
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            app_config = config.load_app_config(args.config)
+        run_hook(args.message_file, args.source, app_config)
+    except Exception as e:
+        # Hook tidak boleh memblokir commit dalam kondisi apa pun
+        print(f"⚠️ git-acpr-auto: hook dilewati ({e})", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,166 @@
+import hashlib
+import json
+import re
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 import google.generativeai as genai
+from lib import diff_cluster, diff_model, pr_template
+
+# Batas panjang diff per commit yang dikirim saat membuat ringkasan commit
+MAX_SUMMARY_DIFF_CHARS = 8000
+# Jumlah ringkasan commit per kelompok sebelum diringkas lagi (ringkasan bertingkat)
+SUMMARY_GROUP_SIZE = 20
+# Batas panjang diff untuk section naratif yang tidak menerima konteks lengkap
+MAX_SECTION_DIFF_CHARS = 4000
+
+# Versi prompt ikut menjadi bagian kunci cache; naikkan jika isi prompt diubah
+PROMPT_VERSIONS = {
+    'commit-message': 'commit-message-v1',
+    'commit-summary': 'commit-summary-v1',
+    'commit-group-summary': 'commit-group-summary-v1',
+    'strict-pr-body': 'strict-pr-body-v3',
+}
+
+# Pengaturan client cache LLM bersama (nonaktif jika 'url' kosong)
+CACHE_SETTINGS = {
+    'url': None,
+    'ttl': 7 * 24 * 3600,
+    'timeout': 2.0,
+    'token': None,
+    'unreachable': False,
+}
+
+HUNK_HEADER_PATTERN = re.compile(r'^@@ -\d+(?:,\d+)? \+\d+(?:,\d+)? @@')
+
+def run_with_deadline(func, timeout):
+    """
+    Menjalankan `func` di thread daemon dan menunggu hasilnya paling lama `timeout` detik.
+    Mengembalikan tuple (selesai, hasil). Thread yang melewati deadline dibiarkan berjalan
+    di background agar tidak memblokir proses utama.
+    """
+    if not timeout or timeout <= 0:
+        return True, func()
+
+    outcome = {}
+
+    def target():
+        try:
+            outcome['result'] = func()
+        except Exception as e:
+            outcome['error'] = e
+
+    worker = threading.Thread(target=target, daemon=True)
+    worker.start()
+    worker.join(timeout)
+    if worker.is_alive():
+        return False, None
+    if 'error' in outcome:
+        raise outcome['error']
+    return True, outcome.get('result')
+
+def configure_cache(url, ttl=None, timeout=None, token=None):
+    """Mengaktifkan client cache LLM bersama. `url` kosong menonaktifkan cache."""
+    CACHE_SETTINGS['url'] = url.rstrip('/') if url else None
+    if ttl:
+        CACHE_SETTINGS['ttl'] = int(ttl)
+    if timeout:
+        CACHE_SETTINGS['timeout'] = float(timeout)
+    CACHE_SETTINGS['token'] = token or None
+    CACHE_SETTINGS['unreachable'] = False
+    if CACHE_SETTINGS['url']:
+        print(f"ℹ️  Cache LLM bersama diaktifkan: {CACHE_SETTINGS['url']}")
+
+def normalize_diff(diff_content):
+    """
+    Menormalkan diff agar perubahan yang sama menghasilkan hash yang sama setelah rebase/cherry-pick:
+    baris 'index' dan nomor baris pada header hunk dibuang, spasi di akhir baris diabaikan.
+    """
+    lines = []
+    for line in diff_model.as_parsed(diff_content).text.splitlines():
+        if line.startswith('index '):
+            continue
+        if line.startswith('@@'):
+            line = HUNK_HEADER_PATTERN.sub('@@', line)
+        lines.append(line.rstrip())
+    return "\n".join(lines).strip()
+
+def make_cache_key(kind, diff_content, model_name, extra=""):
+    """Membuat kunci cache dari hash diff yang dinormalisasi, nama model, dan versi prompt."""
+    digest = hashlib.sha256()
+    for part in (PROMPT_VERSIONS[kind], model_name, normalize_diff(diff_content), extra):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+def _cache_request(method, key, payload=None):
+    """Mengirim request ke service cache. Mengembalikan (status, body) atau None jika tidak terjangkau."""
+    if not CACHE_SETTINGS['url'] or CACHE_SETTINGS['unreachable']:
+        return None
+    data = json.dumps(payload).encode('utf-8') if payload is not None else None
+    request = urllib.request.Request(f"{CACHE_SETTINGS['url']}/v1/cache/{key}", data=data, method=method)
+    request.add_header('Content-Type', 'application/json')
+    if CACHE_SETTINGS['token']:
+        request.add_header('X-Cache-Token', CACHE_SETTINGS['token'])
+    try:
+        with urllib.request.urlopen(request, timeout=CACHE_SETTINGS['timeout']) as response:
+            return response.status, json.loads(response.read().decode('utf-8') or '{}')
+    except urllib.error.HTTPError as e:
+        return e.code, {}
+    except (urllib.error.URLError, OSError, ValueError) as e:
+        # Service tidak terjangkau: jangan coba lagi selama proses ini berjalan
+        print(f"⚠️ Cache LLM tidak dapat dihubungi ({e}), langsung menggunakan model.")
+        CACHE_SETTINGS['unreachable'] = True
+        return None
+
+def cache_get(key):
+    """Mengambil hasil dari cache bersama. Mengembalikan None jika tidak ada atau cache tidak aktif."""
+    result = _cache_request('GET', key)
+    if result and result[0] == 200:
+        return result[1].get('value')
+    return None
+
+def cache_put(key, value):
+    """Menyimpan hasil ke cache bersama dengan TTL yang dikonfigurasi. Kegagalan diabaikan."""
+    if value:
+        _cache_request('PUT', key, {'value': value, 'ttl': CACHE_SETTINGS['ttl']})
+
+def get_cached_commit_message(diff_content, model_name, repo_hint=""):
+    """Mengambil pesan commit untuk diff ini dari cache bersama, tanpa memanggil model."""
+    return cache_get(make_cache_key('commit-message', diff_content, model_name, extra=repo_hint or ""))
+
+def put_cached_commit_message(diff_content, model_name, commit_message, repo_hint=""):
+    """Menyimpan pesan commit untuk diff ini ke cache bersama."""
+    cache_put(make_cache_key('commit-message', diff_content, model_name, extra=repo_hint or ""), commit_message)
+
+def generate_commit_message(diff_content, model_name, timeout=None, repo_hint="", use_cache=True):
+    """
+    Mengirimkan diff ke Gemini API untuk membuat pesan commit.
+    Jika `timeout` (detik) diberikan dan terlewati, mengembalikan None.
+    `repo_hint` berisi konvensi repository (tipe, scope, panjang) yang menggantikan contoh umum di prompt.
+    `use_cache=False` melewati cache bersama (baca dan tulis), misalnya jika pemanggil sudah mengeceknya sendiri.
+    """
+    cache_key = make_cache_key('commit-message', diff_content, model_name, extra=repo_hint or "")
+    cached_message = cache_get(cache_key) if use_cache else None
+    if cached_message:
+        print("⚡ Pesan commit diambil dari cache LLM bersama.")
+        return cached_message
+
+    if repo_hint:
+        convention = f"Konvensi repository: {repo_hint}"
+    else:
+        convention = "Contoh: feat: add user authentication feature"
 
-def generate_commit_message(diff_content, model_name):
-    """Mengirimkan diff ke Gemini API untuk membuat pesan commit."""
     # Prompt untuk Gemini
     prompt = f"""
     Anda adalah seorang asisten yang membantu membuat pesan commit Git. Berdasarkan perubahan kode berikut, buatlah satu baris pesan commit yang ringkas namun deskriptif dalam format conventional commit. Fokus pada tujuan utama dari perubahan ini.
+    Baris "# [cluster]" berarti perubahan yang sama berulang di file lain.
 
-    Contoh: feat: add user authentication feature
+    {convention}
 
     Diff:
-    {diff_content}
+    {diff_cluster.compact_diff(diff_content)}
 
     Pesan commit (hanya satu baris):
     """
@@ -17,7 +168,10 @@ def generate_commit_message(diff_content, model_name):
     try:
         print(f"Menganalisis perubahan dan membuat pesan commit menggunakan model '{model_name}'...")
         model = genai.GenerativeModel(model_name)
-        response = model.generate_content(prompt)
+        finished, response = run_with_deadline(lambda: model.generate_content(prompt), timeout)
+        if not finished:
+            print(f"⏱️ Gemini API tidak merespons dalam {timeout} detik.")
+            return None
         commit_message = response.text.strip()
         
         # Hapus prefix atau konten tidak relevan lainnya dari respons Gemini
@@ -25,7 +179,10 @@ def generate_commit_message(diff_content, model_name):
             commit_message = commit_message.replace("Pesan commit:", "").strip()
         
         # Pastikan hanya satu baris
-        return commit_message.split('\n')[0]
+        commit_message = commit_message.split('\n')[0]
+        if use_cache:
+            cache_put(cache_key, commit_message)
+        return commit_message
         
     except Exception as e:
         print(f"❌ Error saat menghubungi Gemini API: {e}")
@@ -112,8 +269,57 @@ def generate_enhanced_pr_body(diff_content, model_name, commit_message, pr_templ
         print(f"❌ Error saat menghubungi Gemini API untuk enhanced PR body: {e}")
         return None
 
+def generate_pr_section(section_title, section_guide, commit_message, context, model_name):
+    """Meminta AI mengisi satu section naratif dari template PR (tanpa header) dengan konteks yang diberikan."""
+    prompt = f"""
+    Anda adalah seorang technical writer ahli yang mengisi SATU section dari deskripsi Pull Request.
+    Tulis hanya isi section "{section_title}" dalam markdown, tanpa header section dan tanpa teks tambahan.
+    Jika section tidak relevan, tulis "Tidak ada."
+
+    Panduan isi section dari template:
+    {section_guide or "-"}
+
+    Pesan Commit:
+    {commit_message}
+
+    {context}
+
+    Isi section "{section_title}":
+    """
+    model = genai.GenerativeModel(model_name)
+    response = model.generate_content(prompt)
+    content = response.text.strip()
+    # Buang header yang kadang tetap ditulis model
+    if content.startswith('#'):
+        content = content.split('\n', 1)[1].strip() if '\n' in content else ""
+    return content
+
+def fill_narrative_sections(sections, contents, contexts, commit_message, model_name):
+    """
+    Mengisi section naratif secara paralel, satu request kecil per section.
+    `contexts` memetakan index section ke konteks prompt-nya. Mengembalikan `contents` yang sudah diisi.
+    """
+    if not contexts:
+        return contents
+    with ThreadPoolExecutor(max_workers=len(contexts)) as executor:
+        futures = {
+            i: executor.submit(
+                generate_pr_section, sections[i]['title'], sections[i]['body'],
+                commit_message, context, model_name
+            )
+            for i, context in contexts.items()
+        }
+        for i, future in futures.items():
+            contents[i] = future.result()
+    return contents
+
 def generate_strict_template_pr_body(diff_content, model_name, commit_message, pr_template_content, unused_diffs):
-    """Membuat PR body dengan strict adherence ke template, menggunakan unused diff files sebagai konteks."""
+    """
+    Membuat PR body dengan strict adherence ke template, menggunakan unused diff files sebagai konteks.
+    Template dipecah per section: checkbox dan section mekanis diisi lokal dari analisis diff,
+    hanya section naratif yang dikirim ke model secara paralel. Konteks diff lama hanya dikirim ke
+    section deskripsi; section naratif lain menerima diff yang dipotong. Struktur akhir disusun secara lokal.
+    """
     
     # Buat konteks dari unused diff files
     unused_context = ""
@@ -124,40 +330,152 @@ def generate_strict_template_pr_body(diff_content, model_name, commit_message, p
             unused_context += f"\n{i}. Diff File: {diff_info['filename']} (Hash: {diff_info['hash']})\n"
             unused_context += f"```diff\n{diff_info['content']}\n```\n"
     
+    parsed = diff_model.as_parsed(diff_content)
+    context_hashes = ",".join(sorted(d['hash'] for d in unused_diffs or []))
+    cache_key = make_cache_key(
+        'strict-pr-body', parsed, model_name,
+        extra=f"{commit_message}\0{pr_template_content}\0{context_hashes}"
+    )
+    cached_body = cache_get(cache_key)
+    if cached_body:
+        print("⚡ Deskripsi PR diambil dari cache LLM bersama.")
+        return cached_body
+
+    prompt_diff = diff_cluster.compact_diff(parsed)
+    sections = pr_template.parse_template(pr_template_content)
+    analysis = pr_template.analyze_changes(parsed, commit_message)
+    contents = [pr_template.fill_local_section(section, analysis) for section in sections]
+    narrative = [i for i, content in enumerate(contents) if content is None]
+
+    full_context = f"Diff Perubahan Saat Ini:\n```diff\n{prompt_diff}\n```\n{unused_context}"
+    trimmed_diff = prompt_diff
+    if len(trimmed_diff) > MAX_SECTION_DIFF_CHARS:
+        trimmed_diff = trimmed_diff[:MAX_SECTION_DIFF_CHARS] + "\n... (diff dipotong)"
+    trimmed_context = f"Diff Perubahan Saat Ini:\n```diff\n{trimmed_diff}\n```"
+    rich = pr_template.context_section_indexes(sections, narrative)
+    contexts = {i: full_context if i in rich else trimmed_context for i in narrative}
+
+    try:
+        print(f"Mengisi {len(narrative)} section naratif template PR secara paralel menggunakan model '{model_name}'...")
+        contents = fill_narrative_sections(sections, contents, contexts, commit_message, model_name)
+        pr_body = pr_template.assemble_body(sections, contents)
+        cache_put(cache_key, pr_body)
+        return pr_body
+    except Exception as e:
+        print(f"❌ Error saat menghubungi Gemini API untuk strict template PR body: {e}")
+        return None
+
+def generate_commit_summary(commit_message, diff_content, model_name):
+    """Meminta AI membuat ringkasan singkat (maksimal 3 poin) dari satu commit."""
     prompt = f"""
-    Anda adalah seorang technical writer ahli yang HARUS mengisi template Pull Request dengan KETAT mengikuti format yang diberikan.
-
-    ATURAN KETAT:
-    1. WAJIB mempertahankan struktur template yang persis sama, termasuk semua header markdown (##)
-    2. WAJIB mengisi setiap bagian dengan konten yang relevan dan informatif
-    3. JANGAN menambah atau mengurangi section dari template
-    4. JANGAN mengubah format atau urutan section
-    5. Gunakan konteks dari unused diff files untuk memberikan analisis yang lebih komprehensif
-    6. Isi checkbox dengan [x] jika relevan, biarkan [ ] jika tidak
-    7. Berikan analisis teknis yang detail berdasarkan semua diff yang tersedia
-
-    Template yang HARUS diikuti (format ini TIDAK BOLEH diubah):
-    ---
-    {pr_template_content}
-    ---
+    Anda adalah seorang asisten yang meringkas satu commit Git untuk deskripsi Pull Request.
+    Berdasarkan pesan commit dan diff berikut, tulis maksimal 3 poin singkat (markdown bullet "- ")
+    yang menjelaskan apa yang berubah dan mengapa. Jangan menambahkan teks lain.
 
     Pesan Commit:
     {commit_message}
 
-    Diff Perubahan Saat Ini:
+    Diff:
     ```diff
-    {diff_content}
+    {diff_cluster.compact_diff(diff_content)[:MAX_SUMMARY_DIFF_CHARS]}
     ```
-    {unused_context}
 
-    HASIL AKHIR (HARUS mengikuti template persis seperti di atas, hanya konten yang diisi):
+    Ringkasan (hanya poin-poin):
+    """
+    cache_key = make_cache_key('commit-summary', diff_content, model_name, extra=commit_message)
+    cached_summary = cache_get(cache_key)
+    if cached_summary:
+        return cached_summary
+
+    try:
+        model = genai.GenerativeModel(model_name)
+        response = model.generate_content(prompt)
+        summary = response.text.strip()
+        cache_put(cache_key, summary)
+        return summary
+    except Exception as e:
+        print(f"❌ Error saat menghubungi Gemini API untuk ringkasan commit: {e}")
+        return None
+
+def _format_commit_summaries(commit_summaries):
+    """Menggabungkan ringkasan per commit menjadi teks untuk prompt."""
+    sections = []
+    for item in commit_summaries:
+        title = item['message'].split('\n')[0]
+        sections.append(f"### {item['hash'][:8]} {title}\n{item['summary']}")
+    return "\n\n".join(sections)
+
+def get_group_summary_cache_key(member_keys, model_name):
+    """Kunci cache ringkasan kelompok: nama model dan hash dari kunci seluruh anggota kelompok."""
+    payload = "\n".join([PROMPT_VERSIONS['commit-group-summary'], *member_keys])
+    return f"{model_name}:group:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+def _summarize_commit_group(commit_summaries, model_name):
+    """Meringkas sekelompok ringkasan commit menjadi satu ringkasan gabungan."""
+    prompt = f"""
+    Gabungkan ringkasan commit berikut menjadi maksimal 5 poin (markdown bullet "- ") yang
+    menjelaskan perubahan utama secara keseluruhan. Jangan menambahkan teks lain.
+
+    {_format_commit_summaries(commit_summaries)}
+
+    Ringkasan gabungan:
     """
-    
     try:
-        print(f"Mengisi template PR dengan strict format menggunakan model '{model_name}'...")
         model = genai.GenerativeModel(model_name)
         response = model.generate_content(prompt)
         return response.text.strip()
     except Exception as e:
-        print(f"❌ Error saat menghubungi Gemini API untuk strict template PR body: {e}")
+        print(f"❌ Error saat menghubungi Gemini API untuk ringkasan kelompok commit: {e}")
+        return None
+
+def generate_pr_body_from_summaries(commit_summaries, model_name, pr_title, pr_template_content, load_files=None,
+                                    summary_cache=None):
+    """
+    Membuat PR body secara bertingkat dari ringkasan per commit, bukan dari diff penuh branch.
+    Jika jumlah commit banyak, ringkasan dikelompokkan dan diringkas lagi sebelum mengisi template.
+    Ringkasan kelompok dibaca dari dan ditulis ke dict `summary_cache` (disimpan oleh pemanggil),
+    sehingga hanya kelompok yang berisi commit baru yang dikirim lagi ke model.
+    Template diisi per section: section lokal dari pesan commit dan daftar file yang berubah,
+    section naratif secara paralel dengan ringkasan commit sebagai konteks.
+    `load_files(with_stats)` mengembalikan daftar file yang berubah; diffstat hanya diminta jika template membutuhkannya.
+    """
+    summaries = commit_summaries
+    while len(summaries) > SUMMARY_GROUP_SIZE:
+        print(f"Meringkas {len(summaries)} ringkasan commit secara bertingkat...")
+        grouped = []
+        for start in range(0, len(summaries), SUMMARY_GROUP_SIZE):
+            group = summaries[start:start + SUMMARY_GROUP_SIZE]
+            # Kelompok tingkat atas diidentifikasi oleh kunci kelompok anggotanya
+            cache_key = get_group_summary_cache_key([item.get('key', item['hash']) for item in group], model_name)
+            group_summary = summary_cache.get(cache_key) if summary_cache is not None else None
+            if not group_summary:
+                group_summary = _summarize_commit_group(group, model_name)
+                if not group_summary:
+                    return None
+                if summary_cache is not None:
+                    summary_cache[cache_key] = group_summary
+            grouped.append({
+                'hash': group[0]['hash'],
+                'key': cache_key,
+                'message': f"{len(group)} commit ({group[0]['hash'][:8]}..{group[-1]['hash'][:8]})",
+                'summary': group_summary,
+            })
+        summaries = grouped
+
+    sections = pr_template.parse_template(pr_template_content)
+    files = (load_files(pr_template.needs_file_stats(sections)) if load_files else None) or []
+    analysis = pr_template.analyze_commits([item['message'] for item in commit_summaries], pr_title, files)
+    contents = [pr_template.fill_local_section(section, analysis) for section in sections]
+    narrative = [i for i, content in enumerate(contents) if content is None]
+
+    context = (
+        "Ringkasan per Commit (gunakan sebagai satu-satunya sumber informasi perubahan):\n"
+        f"{_format_commit_summaries(summaries)}"
+    )
+    try:
+        print(f"Mengisi {len(narrative)} section naratif template PR dari {len(commit_summaries)} ringkasan commit menggunakan model '{model_name}'...")
+        contents = fill_narrative_sections(sections, contents, {i: context for i in narrative}, pr_title, model_name)
+        return pr_template.assemble_body(sections, contents)
+    except Exception as e:
+        print(f"❌ Error saat menghubungi Gemini API untuk PR body dari ringkasan commit: {e}")
         return None
@@ -1,10 +1,12 @@
 import os
-import google.generativeai as genai
 from dotenv import load_dotenv
 import configparser
 
 def configure_api():
     """Memuat variabel .env dan mengkonfigurasi API key Gemini."""
+    # Import ditunda agar mode hook tidak membayar waktu muat library Gemini jika tidak dipakai
+    import google.generativeai as genai
+
     # Coba load .env dari current directory dulu
     load_dotenv()
     api_key = os.getenv("GANAI_API_KEY")
@@ -0,0 +1,143 @@
+import hashlib
+import os
+import re
+from collections import Counter
+
+from lib import diff_model
+
+TOKEN_PATTERN = re.compile(r'\w+|[^\w\s]')
+NUMBER_PATTERN = re.compile(r'^\d+$')
+WORD_PATTERN = re.compile(r'^\w+$')
+# Jumlah maksimal nama file yang ditampilkan per cluster
+MAX_LISTED_FILES = 10
+
+def path_tokens(path):
+    """Token yang berasal dari path file (nama direktori, nama file, dan stem) untuk dibuang saat normalisasi."""
+    tokens = set(re.split(r'[/.\-]', path))
+    tokens.add(os.path.splitext(os.path.basename(path))[0])
+    tokens.discard('')
+    return tokens
+
+def normalize_tokens(line, ignored):
+    """Token baris dengan token path diganti '<PATH>' dan angka dibuang."""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(line):
+        if token in ignored:
+            tokens.append('<PATH>')
+        elif not NUMBER_PATTERN.match(token):
+            tokens.append(token)
+    return tokens
+
+def line_shape(kind, tokens, delta):
+    """
+    Bentuk baris yang berubah: token pertama (jenis statement) dan tanda baca dipertahankan,
+    token selisih menjadi '<D>', dan identifier lain menjadi '<W>'.
+    """
+    shape = [kind]
+    for index, token in enumerate(tokens):
+        if token in delta:
+            shape.append('<D>')
+        elif index == 0 or not WORD_PATTERN.match(token):
+            shape.append(token)
+        else:
+            shape.append('<W>')
+    return tuple(shape)
+
+def hunk_signature(hunk_lines, path):
+    """
+    Membuat signature hunk dari selisih token antara baris yang dihapus dan ditambahkan,
+    ditambah bentuk baris-baris yang berubah. Path dan angka dinormalisasi, sehingga hunk dengan
+    perubahan yang sama di file berbeda (misalnya rename import atau bump versi) menghasilkan
+    signature yang sama, sedangkan selisih yang sama di konteks berbeda (import vs. isi fungsi) tidak.
+    """
+    ignored = path_tokens(path)
+    removed, added = Counter(), Counter()
+    changed = []
+    for line in hunk_lines[1:]:
+        if line.startswith('-'):
+            target = removed
+        elif line.startswith('+'):
+            target = added
+        else:
+            continue
+        tokens = normalize_tokens(line[1:], ignored)
+        target.update(tokens)
+        changed.append((line[0], tokens))
+
+    removed_only = sorted((removed - added).items())
+    added_only = sorted((added - removed).items())
+    delta = {token for token, _ in removed_only + added_only}
+    shapes = [line_shape(kind, tokens, delta) for kind, tokens in changed]
+    if not removed_only and not added_only:
+        # Perubahan hanya pada angka (mis. bump versi): gunakan isi baris yang dinormalisasi
+        removed_only = sorted(removed.items())
+        added_only = sorted(added.items())
+    return hashlib.sha1(repr((removed_only, added_only, shapes)).encode('utf-8')).hexdigest()
+
+def cluster_hunks(parsed):
+    """Mengelompokkan hunk berdasarkan signature. Mengembalikan dict signature -> list (index file, index hunk)."""
+    clusters = {}
+    for file_index, diff_file in enumerate(parsed.files):
+        for hunk_index, hunk in enumerate(diff_file.hunks):
+            signature = hunk_signature(parsed.hunk_lines(hunk), diff_file.path)
+            clusters.setdefault(signature, []).append((file_index, hunk_index))
+    return clusters
+
+def format_cluster_note(members, files):
+    """Membuat catatan ringkas untuk cluster: jumlah hunk serupa dan daftar file-nya."""
+    other_paths = []
+    for file_index, _ in members[1:]:
+        path = files[file_index].path
+        if path not in other_paths:
+            other_paths.append(path)
+    listed = ", ".join(other_paths[:MAX_LISTED_FILES])
+    remaining = len(other_paths) - MAX_LISTED_FILES
+    if remaining > 0:
+        listed += f", dan {remaining} file lainnya"
+    return f"# [cluster] Perubahan yang sama juga ada di {len(members) - 1} hunk lain pada {len(other_paths)} file: {listed}\n"
+
+def compact_diff(diff, min_cluster_size=2):
+    """
+    Meringkas diff dengan mengelompokkan hunk yang identik atau hampir identik.
+    Hanya satu hunk perwakilan per cluster yang dipertahankan, disertai jumlah dan daftar file.
+    `diff` dapat berupa teks diff atau `ParsedDiff`; hasilnya selalu berupa teks.
+    Mengembalikan diff asli jika pengelompokan tidak memperkecil ukuran.
+    """
+    parsed = diff_model.as_parsed(diff)
+    if not parsed:
+        return parsed.text
+    files = parsed.files
+    clusters = cluster_hunks(parsed)
+
+    skipped = set()
+    notes = {}
+    for members in clusters.values():
+        if len(members) < min_cluster_size:
+            continue
+        notes[members[0]] = format_cluster_note(members, files)
+        skipped.update(members[1:])
+    if not skipped:
+        return parsed.text
+
+    output = []
+    for file_index, diff_file in enumerate(files):
+        kept = [
+            (hunk_index, hunk) for hunk_index, hunk in enumerate(diff_file.hunks)
+            if (file_index, hunk_index) not in skipped
+        ]
+        # File yang semua hunk-nya terwakili cluster lain cukup disebut di catatan cluster
+        if diff_file.hunks and not kept:
+            continue
+        output.append(parsed.header_text(diff_file))
+        for hunk_index, hunk in kept:
+            output.append(parsed.hunk_text(hunk))
+            note = notes.get((file_index, hunk_index))
+            if note:
+                # Hunk terakhir bisa tidak diakhiri newline jika diff sudah di-strip
+                output.append(note if output[-1].endswith('\n') else '\n' + note)
+
+    compacted = "".join(output)
+    if len(compacted) >= len(parsed):
+        return parsed.text
+    print(f"🧩 Diff diringkas dengan clustering hunk: {len(parsed)} → {len(compacted)} karakter.")
+    return compacted
@@ -0,0 +1,184 @@
+class Hunk:
+    """Satu hunk diff, disimpan sebagai offset ke buffer diff bersama."""
+    __slots__ = ('start', 'end', 'added', 'deleted')
+
+    def __init__(self, start):
+        self.start = start
+        self.end = start
+        self.added = 0
+        self.deleted = 0
+
+class FileDiff:
+    """Ringkasan perubahan satu file, dengan offset header dan hunk ke buffer diff bersama."""
+    __slots__ = ('path', 'old_path', 'status', 'binary', 'start', 'header_end', 'end', 'hunks', 'added', 'deleted')
+
+    def __init__(self, path, old_path, start):
+        self.path = path
+        self.old_path = old_path
+        self.status = 'M'
+        self.binary = False
+        self.start = start
+        self.header_end = start
+        self.end = start
+        self.hunks = []
+        self.added = 0
+        self.deleted = 0
+
+class ParsedDiff:
+    """
+    Hasil parsing output `git diff` yang dipakai bersama oleh semua tahap pipeline.
+    Teks diff hanya disimpan sekali; file dan hunk hanya menyimpan offset ke teks tersebut.
+    """
+    __slots__ = ('text', 'files', 'added', 'deleted')
+
+    def __init__(self, text, files):
+        self.text = text
+        self.files = files
+        self.added = sum(f.added for f in files)
+        self.deleted = sum(f.deleted for f in files)
+
+    def __str__(self):
+        return self.text
+
+    def __len__(self):
+        return len(self.text)
+
+    def __bool__(self):
+        return bool(self.text)
+
+    def paths(self):
+        """Daftar path file yang berubah."""
+        return [f.path for f in self.files]
+
+    def header_text(self, diff_file):
+        """Teks header file (baris 'diff --git' sampai sebelum hunk pertama)."""
+        return self.text[diff_file.start:diff_file.header_end]
+
+    def hunk_text(self, hunk):
+        """Teks satu hunk, termasuk baris header '@@'."""
+        return self.text[hunk.start:hunk.end]
+
+    def hunk_lines(self, hunk):
+        """Baris-baris satu hunk, termasuk baris header '@@'."""
+        return self.text[hunk.start:hunk.end].splitlines()
+
+    def added_lines(self, diff_file):
+        """Baris yang ditambahkan (diawali '+') pada semua hunk sebuah file."""
+        for hunk in diff_file.hunks:
+            for line in self.hunk_lines(hunk)[1:]:
+                if line.startswith('+'):
+                    yield line
+
+# Escape C-style yang dipakai Git saat mengutip path (core.quotePath)
+QUOTED_PATH_ESCAPES = {'a': '\a', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t', 'v': '\v'}
+
+def read_quoted_path(value):
+    """
+    Membaca path yang dikutip Git (mis. "a/caf\\303\\251.py") dari awal `value`.
+    Mengembalikan tuple (path, sisa teks setelah tanda kutip penutup).
+    """
+    raw = bytearray()
+    index = 1
+    while index < len(value) and value[index] != '"':
+        char = value[index]
+        if char == '\\' and index + 1 < len(value):
+            escaped = value[index + 1]
+            if escaped in '01234567':
+                # Byte UTF-8 ditulis sebagai oktal tiga digit
+                raw.append(int(value[index + 1:index + 4], 8) & 0xFF)
+                index += 4
+                continue
+            raw += QUOTED_PATH_ESCAPES.get(escaped, escaped).encode('utf-8')
+            index += 2
+            continue
+        raw += char.encode('utf-8')
+        index += 1
+    return raw.decode('utf-8', errors='replace'), value[index + 1:].lstrip(' ')
+
+def unquote_path(value):
+    """Mengembalikan path apa adanya, atau hasil decode jika dikutip oleh Git."""
+    return read_quoted_path(value)[0] if value.startswith('"') else value
+
+def split_header_paths(paths):
+    """Memisahkan path lama dan baru (tanpa prefix a/ dan b/) dari baris 'diff --git'."""
+    if paths.startswith('"'):
+        old_path, new_path = read_quoted_path(paths)
+        new_path = unquote_path(new_path)
+    elif paths.endswith('"') and ' "b/' in paths:
+        old_path, _, new_path = paths.rpartition(' "b/')
+        new_path = unquote_path('"b/' + new_path)
+    else:
+        old_path, _, new_path = paths.partition(' b/')
+        new_path = 'b/' + new_path if new_path else ''
+    return old_path[2:], new_path[2:]
+
+def parse_diff(text):
+    """Mem-parsing output `git diff` sekali menjadi `ParsedDiff` dengan record per file dan per hunk."""
+    text = text or ""
+    files = []
+    current = None
+    hunk = None
+    position = 0
+    length = len(text)
+    # Prefix dicek langsung pada buffer agar tidak membuat salinan setiap baris
+    starts = text.startswith
+
+    while position < length:
+        newline = text.find('\n', position)
+        line_end = length if newline == -1 else newline + 1
+
+        if starts('diff --git ', position):
+            if current is not None:
+                current.end = position
+                if hunk is None:
+                    current.header_end = position
+                else:
+                    hunk.end = position
+            paths = text[position + len('diff --git '):line_end].rstrip('\n')
+            old_path, new_path = split_header_paths(paths)
+            current = FileDiff(new_path or old_path, old_path, position)
+            files.append(current)
+            hunk = None
+        elif current is None:
+            pass
+        elif starts('@@', position):
+            if hunk is None:
+                current.header_end = position
+            else:
+                hunk.end = position
+            hunk = Hunk(position)
+            current.hunks.append(hunk)
+        elif hunk is not None:
+            if starts('+', position):
+                hunk.added += 1
+                current.added += 1
+            elif starts('-', position):
+                hunk.deleted += 1
+                current.deleted += 1
+        elif starts('new file mode', position):
+            current.status = 'A'
+        elif starts('deleted file mode', position):
+            current.status = 'D'
+        elif starts('rename from ', position):
+            current.status = 'R'
+            current.old_path = unquote_path(text[position + len('rename from '):line_end].rstrip('\n'))
+        elif starts('rename to ', position):
+            current.path = unquote_path(text[position + len('rename to '):line_end].rstrip('\n'))
+        elif starts('Binary files ', position):
+            current.binary = True
+
+        position = line_end
+
+    if current is not None:
+        current.end = length
+        if hunk is None:
+            current.header_end = length
+        else:
+            hunk.end = length
+    return ParsedDiff(text, files)
+
+def as_parsed(diff):
+    """Mengembalikan `ParsedDiff` dari teks diff, atau objek itu sendiri jika sudah di-parse."""
+    if isinstance(diff, ParsedDiff):
+        return diff
+    return parse_diff(diff)
@@ -1,7 +1,18 @@
+import json
 import subprocess
 import shutil
 import os
 
+from lib import diff_model
+
+COMPARISON_CACHE_FILENAME = 'acpr_compare.json'
+# Jumlah entri perbandingan branch yang disimpan di .git
+MAX_COMPARISON_ENTRIES = 20
+# Cache perbandingan branch di memori untuk proses yang sedang berjalan
+_COMPARISON_MEMO = {}
+# Hash HEAD dan ujung target branch yang sudah di-resolve selama proses berjalan
+_RESOLVED_TIPS = {}
+
 def get_current_branch():
     """Mendapatkan nama branch Git saat ini."""
     try:
@@ -27,6 +38,50 @@ def has_unpushed_commits():
         # Kita tidak bisa yakin, jadi lebih aman menganggap tidak ada.
         return False
 
+def get_git_dir():
+    """Mendapatkan path absolut direktori .git dari repository saat ini."""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--absolute-git-dir"],
+            capture_output=True, text=True, check=True
+        )
+        return result.stdout.strip()
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+
+def is_ancestor(ancestor, descendant="HEAD"):
+    """Mengecek apakah commit `ancestor` merupakan leluhur dari `descendant`."""
+    result = subprocess.run(
+        ["git", "merge-base", "--is-ancestor", ancestor, descendant],
+        capture_output=True, text=True
+    )
+    return result.returncode == 0
+
+def get_log_with_files(revision_range="HEAD", max_count=None):
+    """
+    Mendapatkan riwayat commit beserta file yang diubah.
+    Mengembalikan list tuple (hash, subject, [path]) dari commit terbaru ke terlama.
+    """
+    command = ["git", "log", "--format=%x1e%H%x1f%s", "--name-only", "--no-renames"]
+    if max_count:
+        command.append(f"--max-count={max_count}")
+    command.append(revision_range)
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, check=True)
+    except subprocess.CalledProcessError:
+        # Terjadi pada repository tanpa commit atau range yang tidak valid
+        return None
+
+    commits = []
+    for record in result.stdout.split("\x1e"):
+        if not record.strip():
+            continue
+        header, _, names = record.partition("\n")
+        commit_hash, _, subject = header.partition("\x1f")
+        files = [name for name in names.splitlines() if name]
+        commits.append((commit_hash, subject, files))
+    return commits
+
 def get_last_commit_message():
     """Mendapatkan pesan dari commit terakhir."""
     try:
@@ -59,28 +114,232 @@ def get_diff_for_unpushed_commits():
         # Terjadi jika upstream tidak di-set atau tidak ada perbedaan.
         return None
 
-def get_diff_against_branch(target_branch):
-    """Mendapatkan diff dari branch saat ini terhadap target branch."""
+def resolve_commit(revision):
+    """Mendapatkan hash lengkap dari sebuah revision (branch, tag, atau HEAD)."""
     try:
         result = subprocess.run(
-            ["git", "diff", f"{target_branch}...HEAD"],
+            ["git", "rev-parse", "--verify", "--quiet", f"{revision}^{{commit}}"],
             capture_output=True, text=True, check=True
         )
         return result.stdout.strip()
+    except subprocess.CalledProcessError:
+        return None
+
+def get_pushed_commit(branch_name):
+    """
+    Mendapatkan hash commit branch yang sudah ada di remote (upstream, atau origin/<branch>
+    jika upstream belum di-set). Mengembalikan None jika branch belum pernah di-push.
+    """
+    return resolve_commit("@{u}") or resolve_commit(f"origin/{branch_name}")
+
+def _load_comparison_cache():
+    """Memuat cache perbandingan branch dari direktori .git."""
+    git_dir = get_git_dir()
+    if not git_dir:
+        return None, {}
+    cache_path = os.path.join(git_dir, COMPARISON_CACHE_FILENAME)
+    if not os.path.exists(cache_path):
+        return cache_path, {}
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return cache_path, json.load(f)
+    except (OSError, ValueError):
+        return cache_path, {}
+
+def _save_comparison_cache(cache_path, entries):
+    """Menyimpan cache perbandingan branch, hanya mempertahankan entri terbaru."""
+    if not cache_path:
+        return
+    recent = dict(list(entries.items())[-MAX_COMPARISON_ENTRIES:])
+    try:
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump(recent, f)
+    except OSError:
+        pass
+
+def get_branch_comparison(target_branch):
+    """
+    Membandingkan HEAD dengan target branch: merge base, daftar commit, dan name-status.
+    Hasil di-cache (di memori dan di .git) dengan kunci (hash HEAD, hash ujung target branch),
+    sehingga merge base tidak dihitung ulang selama kedua ujung tidak berubah.
+    Diffstat dan diff lengkap tidak dihitung di sini; keduanya diambil saat dibutuhkan.
+    Mengembalikan dict atau None jika terjadi error.
+    """
+    if target_branch not in _RESOLVED_TIPS:
+        _RESOLVED_TIPS[target_branch] = (resolve_commit("HEAD"), resolve_commit(target_branch))
+    head, target_tip = _RESOLVED_TIPS[target_branch]
+    if not head or not target_tip:
+        del _RESOLVED_TIPS[target_branch]
+        print(f"❌ Error: Tidak dapat menemukan commit untuk HEAD atau branch '{target_branch}'.")
+        return None
+
+    key = f"{head}:{target_tip}"
+    if key in _COMPARISON_MEMO:
+        return _COMPARISON_MEMO[key]
+
+    cache_path, entries = _load_comparison_cache()
+    comparison = entries.get(key)
+    if comparison is None:
+        try:
+            merge_base = subprocess.run(
+                ["git", "merge-base", target_tip, head],
+                capture_output=True, text=True, check=True
+            ).stdout.strip()
+            name_status = subprocess.run(
+                ["git", "diff", "--name-status", merge_base, head],
+                capture_output=True, text=True, check=True
+            ).stdout
+        except subprocess.CalledProcessError as e:
+            print(f"❌ Error saat membandingkan dengan branch {target_branch}: {e.stderr}")
+            return None
+        commits = get_commit_list(f"{target_tip}..{head}")
+        if commits is None:
+            return None
+
+        comparison = {
+            'head': head,
+            'target_tip': target_tip,
+            'merge_base': merge_base,
+            'commits': [list(commit) for commit in commits],
+            'name_status': [line.split('\t') for line in name_status.splitlines() if line],
+        }
+        entries.pop(key, None)
+        entries[key] = comparison
+        _save_comparison_cache(cache_path, entries)
+
+    _COMPARISON_MEMO[key] = comparison
+    return comparison
+
+def has_changes_against_branch(target_branch):
+    """
+    Mengecek apakah branch saat ini memiliki commit atau perubahan terhadap target branch,
+    tanpa mengambil diff lengkap. Mengembalikan None jika perbandingan gagal.
+    """
+    comparison = get_branch_comparison(target_branch)
+    if comparison is None:
+        return None
+    return bool(comparison['commits'] or comparison['name_status'])
+
+def get_diff_against_branch(target_branch):
+    """Mendapatkan diff dari branch saat ini terhadap target branch (setara `target...HEAD`)."""
+    comparison = get_branch_comparison(target_branch)
+    if comparison is None:
+        return None
+    if 'diff' not in comparison:
+        try:
+            result = subprocess.run(
+                ["git", "diff", comparison['merge_base'], comparison['head']],
+                capture_output=True, text=True, check=True
+            )
+        except subprocess.CalledProcessError as e:
+            print(f"❌ Error saat mendapatkan diff terhadap branch {target_branch}: {e.stderr}")
+            return None
+        # Diff lengkap hanya disimpan di memori, tidak ditulis ke cache di .git
+        comparison['diff'] = result.stdout.strip()
+    return comparison['diff']
+
+def get_branch_diffstat(target_branch):
+    """
+    Mendapatkan jumlah baris tambah/hapus per file terhadap target branch sebagai dict {path: (tambah, hapus)}.
+    Dihitung hanya saat dibutuhkan dan disimpan di memori, seperti diff lengkap.
+    """
+    comparison = get_branch_comparison(target_branch)
+    if comparison is None:
+        return None
+    if 'diffstat' not in comparison:
+        try:
+            result = subprocess.run(
+                ["git", "diff", "--numstat", "-z", comparison['merge_base'], comparison['head']],
+                capture_output=True, text=True, check=True
+            )
+        except subprocess.CalledProcessError as e:
+            print(f"❌ Error saat menghitung diffstat terhadap branch {target_branch}: {e.stderr}")
+            return None
+
+        stats = {}
+        fields = result.stdout.split('\0')
+        index = 0
+        while index < len(fields):
+            if not fields[index]:
+                index += 1
+                continue
+            added, deleted, path = fields[index].split('\t', 2)
+            index += 1
+            if not path:
+                # Rename/copy dengan -z: path lama dan baru berada di field berikutnya
+                path = fields[index + 1]
+                index += 2
+            # File biner ditandai '-' oleh numstat
+            stats[path] = (int(added) if added.isdigit() else 0, int(deleted) if deleted.isdigit() else 0)
+        comparison['diffstat'] = stats
+    return comparison['diffstat']
+
+def get_branch_file_changes(target_branch, with_stats=False):
+    """
+    Mendapatkan daftar file yang berubah terhadap target branch sebagai `FileDiff` tanpa isi diff.
+    Jumlah baris tambah/hapus hanya diisi jika `with_stats`.
+    """
+    comparison = get_branch_comparison(target_branch)
+    if comparison is None:
+        return None
+
+    stats = (get_branch_diffstat(target_branch) if with_stats else None) or {}
+
+    files = []
+    for fields in comparison['name_status']:
+        status = fields[0][:1]
+        # Path dengan karakter khusus dikutip oleh Git (core.quotePath)
+        paths = [diff_model.unquote_path(field) for field in fields[1:]]
+        if status in ('R', 'C'):
+            diff_file = diff_model.FileDiff(paths[1], paths[0], 0)
+            diff_file.status = 'R' if status == 'R' else 'A'
+        else:
+            diff_file = diff_model.FileDiff(paths[-1], paths[-1], 0)
+            diff_file.status = status if status in ('A', 'D') else 'M'
+        diff_file.added, diff_file.deleted = stats.get(diff_file.path, (0, 0))
+        files.append(diff_file)
+    return files
+
+def get_commit_list(revision_range):
+    """
+    Mendapatkan daftar commit (hash dan pesan lengkap) dalam sebuah revision range.
+    Diurutkan dari commit terlama ke terbaru.
+    """
+    try:
+        result = subprocess.run(
+            ["git", "log", "--reverse", "--format=%H%x1f%B%x1e", revision_range],
+            capture_output=True, text=True, check=True
+        )
     except subprocess.CalledProcessError as e:
-        print(f"❌ Error saat mendapatkan diff terhadap branch {target_branch}: {e.stderr}")
+        print(f"❌ Error saat mendapatkan daftar commit untuk {revision_range}: {e.stderr}")
+        return None
+
+    commits = []
+    for record in result.stdout.split("\x1e"):
+        record = record.strip()
+        if not record:
+            continue
+        commit_hash, _, message = record.partition("\x1f")
+        commits.append((commit_hash.strip(), message.strip()))
+    return commits
+
+def get_commit_list_against_branch(target_branch):
+    """Mendapatkan daftar commit (hash, pesan) dari branch saat ini yang tidak ada di target branch."""
+    comparison = get_branch_comparison(target_branch)
+    if comparison is None:
         return None
+    return [tuple(commit) for commit in comparison['commits']]
 
-def get_commits_against_branch(target_branch):
-    """Mendapatkan daftar commit dari branch saat ini yang tidak ada di target branch."""
+def get_commit_diff(commit_hash):
+    """Mendapatkan diff dari satu commit tertentu (tanpa header commit)."""
     try:
         result = subprocess.run(
-            ["git", "log", f"{target_branch}..HEAD", "--oneline"],
+            ["git", "show", "--format=", "--patch", commit_hash],
             capture_output=True, text=True, check=True
         )
         return result.stdout.strip()
     except subprocess.CalledProcessError as e:
-        print(f"❌ Error saat mendapatkan commits terhadap branch {target_branch}: {e.stderr}")
+        print(f"❌ Error saat mendapatkan diff commit {commit_hash[:8]}: {e.stderr}")
         return None
 
 def git_add():
@@ -119,6 +378,8 @@ def git_commit(message):
         print("❌ Error saat membuat commit:")
         print(result.stderr)
         return False
+    # HEAD berubah: hash yang sudah di-resolve tidak berlaku lagi
+    _RESOLVED_TIPS.clear()
     print("✅ Commit berhasil dibuat!")
     return True
 
@@ -142,11 +403,14 @@ def git_push(branch_name):
     return True
 
 def create_pull_request(target_branch, title, body, reviewer=None):
-    """Membuat Pull Request menggunakan GitHub CLI ('gh')."""
+    """
+    Membuat Pull Request menggunakan GitHub CLI ('gh').
+    Mengembalikan URL PR (output 'gh pr create') jika berhasil, atau None jika gagal.
+    """
     if not shutil.which("gh"):
         print("❌ Error: GitHub CLI ('gh') tidak ditemukan. Fungsionalitas PR tidak dapat berjalan.")
         print("  Silakan install dari: https://cli.github.com/ dan jalankan 'gh auth login'.")
-        return False
+        return None
 
     print(f"\nMembuat Pull Request ke branch '{target_branch}'...")
     command = [
@@ -163,10 +427,49 @@ def create_pull_request(target_branch, title, body, reviewer=None):
     
     result = subprocess.run(command, capture_output=True, text=True)
     if result.returncode != 0:
+        if "already exists" in result.stderr:
+            print("ℹ️ Pull Request untuk branch ini sudah ada. Jalankan ulang untuk memperbarui PR tersebut.")
         print("❌ Error saat membuat Pull Request:")
         print(result.stderr)
-        return False
+        return None
     
     print("✅ Pull Request berhasil dibuat!")
     print(result.stdout) # Tampilkan URL PR
+    return result.stdout.strip()
+
+def get_existing_pull_request(branch_name):
+    """
+    Mencari Pull Request yang masih terbuka untuk branch tertentu menggunakan GitHub CLI.
+    Mengembalikan dict (number, url, body, baseRefName) atau None jika tidak ada.
+    """
+    if not shutil.which("gh"):
+        return None
+    result = subprocess.run(
+        ["gh", "pr", "view", branch_name, "--json", "number,url,body,state,baseRefName"],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        # gh mengembalikan error jika tidak ada PR untuk branch ini
+        return None
+    try:
+        pr_info = json.loads(result.stdout)
+    except ValueError:
+        return None
+    if pr_info.get("state") != "OPEN":
+        return None
+    return pr_info
+
+def edit_pull_request(pr_number, body):
+    """Memperbarui body Pull Request yang sudah ada menggunakan GitHub CLI."""
+    print(f"\nMemperbarui Pull Request #{pr_number}...")
+    result = subprocess.run(
+        ["gh", "pr", "edit", str(pr_number), "--body", body],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        print("❌ Error saat memperbarui Pull Request:")
+        print(result.stderr)
+        return False
+    print("✅ Pull Request berhasil diperbarui!")
+    print(result.stdout)
     return True
@@ -0,0 +1,165 @@
+import os
+import re
+from collections import Counter
+
+from lib import diff_model
+
+# Pola path untuk mengklasifikasikan file yang berubah
+DOC_EXTENSIONS = ('.md', '.rst', '.txt', '.adoc')
+CONFIG_EXTENSIONS = ('.conf', '.ini', '.cfg', '.toml', '.yaml', '.yml', '.json', '.env.example')
+CONFIG_FILENAMES = ('.gitignore', '.gitattributes', '.editorconfig', 'makefile', 'dockerfile')
+DEPENDENCY_FILENAMES = (
+    'requirements.txt', 'requirements-dev.txt', 'pipfile', 'pipfile.lock', 'poetry.lock',
+    'setup.py', 'setup.cfg', 'pyproject.toml', 'package.json', 'package-lock.json',
+    'yarn.lock', 'pnpm-lock.yaml', 'go.mod', 'go.sum', 'cargo.toml', 'cargo.lock', 'gemfile',
+    'gemfile.lock', 'composer.json', 'composer.lock',
+)
+
+DEFINITION_PATTERN = re.compile(r'^\+\s*(?:async\s+)?(?:def|class|function)\s+([A-Za-z_][A-Za-z0-9_]*)')
+FIX_PATTERN = re.compile(r'\b(fix|bug|error|exception|except|raise|typo|crash|invalid)\b', re.IGNORECASE)
+
+def classify_path(path):
+    """Mengklasifikasikan path file menjadi 'test', 'docs', 'deps', 'ci', 'config', atau 'code'."""
+    lower = path.lower()
+    name = os.path.basename(lower)
+    parts = lower.split('/')
+
+    if name in DEPENDENCY_FILENAMES or (name.startswith('requirements') and name.endswith('.txt')):
+        return 'deps'
+    if lower.startswith('.github/workflows/') or name in ('.gitlab-ci.yml', '.travis.yml', 'jenkinsfile'):
+        return 'ci'
+    if ('tests' in parts[:-1] or 'test' in parts[:-1] or name.startswith('test_')
+            or name.endswith(('_test.py', '.spec.js', '.spec.ts', '.test.js', '.test.ts'))):
+        return 'test'
+    if name.endswith(DOC_EXTENSIONS) or 'docs' in parts[:-1] or name.startswith(('readme', 'changelog', 'license')):
+        return 'docs'
+    if name.endswith(CONFIG_EXTENSIONS) or name in CONFIG_FILENAMES or parts[0] in ('.vscode', 'conf', 'config'):
+        return 'config'
+    return 'code'
+
+def scan_added_lines(parsed, diff_file):
+    """
+    Memindai baris yang ditambahkan pada sebuah file.
+    Mengembalikan tuple (daftar definisi baru, apakah ada indikasi perbaikan bug).
+    """
+    definitions = []
+    fix_hint = False
+    for line in parsed.added_lines(diff_file):
+        match = DEFINITION_PATTERN.match(line)
+        if match:
+            definitions.append(match.group(1))
+        if not fix_hint and FIX_PATTERN.search(line):
+            fix_hint = True
+    return definitions, fix_hint
+
+def analyze_files(parsed):
+    """Mengklasifikasikan setiap file dan memindai baris tambahannya. Mengembalikan (kategori, hasil pindai)."""
+    categories = [classify_path(f.path) for f in parsed.files]
+    scans = [
+        scan_added_lines(parsed, f) if kind == 'code' else ([], False)
+        for f, kind in zip(parsed.files, categories)
+    ]
+    return categories, scans
+
+def infer_scope(files):
+    """Menentukan scope conventional commit dari path file yang berubah."""
+    paths = [f.path for f in files]
+    if len(paths) == 1:
+        return os.path.splitext(os.path.basename(paths[0]))[0].lstrip('.') or None
+
+    directories = {p.split('/')[0] if '/' in p else '' for p in paths}
+    if len(directories) == 1:
+        directory = directories.pop()
+        return directory.lstrip('.') or None
+    return None
+
+def infer_commit_type(files, categories, scans):
+    """Menentukan tipe conventional commit dari kategori file dan isi hunk."""
+    kinds = set(categories)
+    if kinds == {'test'}:
+        return 'test'
+    if kinds == {'docs'}:
+        return 'docs'
+    if kinds == {'deps'}:
+        return 'build'
+    if kinds == {'ci'}:
+        return 'ci'
+    if kinds <= {'config', 'deps', 'ci'}:
+        return 'chore'
+
+    code_files = [(f, scan) for f, kind, scan in zip(files, categories, scans) if kind == 'code']
+    if not code_files:
+        # Campuran tanpa file kode (mis. test + docs): gunakan kategori test/docs yang paling banyak
+        counts = Counter(kind for kind in categories if kind in ('test', 'docs'))
+        return 'test' if counts['test'] >= counts['docs'] else 'docs'
+    if all(f.status == 'D' for f, _ in code_files):
+        return 'chore'
+    if all(f.status == 'R' and f.added == f.deleted == 0 for f, _ in code_files):
+        return 'refactor'
+    if any(f.status == 'A' or definitions for f, (definitions, _) in code_files):
+        return 'feat'
+    if any(fix_hint for _, (_, fix_hint) in code_files):
+        return 'fix'
+    # Perubahan kode tanpa file atau definisi baru: tipe netral, bukan fitur
+    return 'refactor'
+
+def describe_subject(files):
+    """Membuat objek kalimat (nama file atau jumlah file) untuk deskripsi commit."""
+    if len(files) == 1:
+        return os.path.basename(files[0].path)
+    return f"{len(files)} files"
+
+def infer_description(commit_type, files, scans):
+    """Membuat deskripsi singkat commit berdasarkan tipe dan perubahan file."""
+    subject = describe_subject(files)
+    statuses = {f.status for f in files}
+
+    if statuses == {'R'}:
+        if len(files) == 1:
+            return f"rename {os.path.basename(files[0].old_path)} to {subject}"
+        return f"move {subject}"
+    if statuses == {'D'}:
+        return f"remove {subject}"
+    if commit_type == 'test':
+        return f"add tests for {subject}" if statuses == {'A'} else f"update tests in {subject}"
+    if commit_type == 'docs':
+        return f"update {subject}"
+    if commit_type == 'build':
+        return f"update dependencies in {subject}"
+
+    definitions = [name for file_definitions, _ in scans for name in file_definitions]
+    if commit_type == 'feat' and definitions:
+        extra = f" and {len(definitions) - 1} more" if len(definitions) > 1 else ""
+        return f"add {definitions[0]}{extra}"
+    if statuses == {'A'}:
+        return f"add {subject}"
+    if commit_type == 'fix':
+        return f"fix handling in {subject}"
+    return f"update {subject}"
+
+def mentions_scope(scope, description):
+    """Mengecek apakah deskripsi sudah menyebut scope sebagai kata utuh atau nama file (tanpa ekstensi)."""
+    for token in description.split():
+        if scope in (token, os.path.splitext(token)[0].lstrip('.')):
+            return True
+    return False
+
+def generate_local_commit_message(diff):
+    """
+    Membuat pesan commit conventional secara lokal dan deterministik, tanpa memanggil API.
+    Tipe dan scope ditebak dari path, diffstat, dan isi hunk dari staged diff.
+    `diff` dapat berupa teks diff atau `ParsedDiff`.
+    """
+    parsed = diff_model.as_parsed(diff)
+    files = parsed.files
+    if not files:
+        return None
+
+    categories, scans = analyze_files(parsed)
+    commit_type = infer_commit_type(files, categories, scans)
+    scope = infer_scope(files)
+    description = infer_description(commit_type, files, scans)
+
+    if scope and not mentions_scope(scope, description):
+        return f"{commit_type}({scope}): {description}"
+    return f"{commit_type}: {description}"
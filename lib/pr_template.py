@@ -0,0 +1,182 @@
+import re
+from collections import Counter
+
+from lib import diff_model, local_commit
+
+CHECKBOX_PATTERN = re.compile(r'^(\s*[-*]\s+)\[[ xX]\](\s+)(.*)$')
+CONVENTIONAL_PATTERN = re.compile(r'^(\w+)(?:\([^)]*\))?(!)?:')
+
+# Section yang diisi manual oleh pembuat PR (misalnya bukti/screenshot) dibiarkan apa adanya
+MANUAL_SECTION_TITLES = ('proof', 'screenshot', 'screenshots', 'bukti')
+# Section yang berisi daftar file diisi langsung dari diff
+FILES_SECTION_TITLES = ('files changed', 'changed files', 'file yang diubah')
+# Section naratif yang mendapat konteks tambahan (diff lama yang belum dipakai untuk PR)
+CONTEXT_SECTION_TITLES = ('description', 'summary', 'deskripsi', 'ringkasan')
+# Section tempat pembaruan PR inkremental dikumpulkan
+UPDATES_HEADING = '## Updates'
+UPDATES_MARKER = '<!-- acpr:updates -->'
+
+def parse_template(template_content):
+    """
+    Memecah template PR menjadi daftar section berdasarkan header markdown '## '.
+    Teks sebelum header pertama disimpan sebagai section dengan heading None.
+    """
+    sections = []
+    current = {'heading': None, 'title': '', 'lines': []}
+    for line in template_content.splitlines():
+        if line.startswith('## '):
+            sections.append(current)
+            title = line[3:].strip().rstrip(':').strip()
+            current = {'heading': line, 'title': title, 'lines': []}
+        else:
+            current['lines'].append(line)
+    sections.append(current)
+
+    for section in sections:
+        section['body'] = "\n".join(section['lines']).strip()
+        section['kind'] = classify_section(section)
+    return [s for s in sections if s['heading'] is not None or s['body']]
+
+def classify_section(section):
+    """Menentukan cara pengisian section: 'static', 'manual', 'files', 'checkbox', atau 'narrative'."""
+    title = section['title'].lower()
+    if section['heading'] is None:
+        return 'static'
+    if title in MANUAL_SECTION_TITLES:
+        return 'manual'
+    if title in FILES_SECTION_TITLES:
+        return 'files'
+    if any(CHECKBOX_PATTERN.match(line) for line in section['lines']):
+        return 'checkbox'
+    return 'narrative'
+
+def analyze_changes(diff_content, commit_message):
+    """Mengumpulkan fakta dari diff dan pesan commit yang dipakai untuk mengisi section lokal."""
+    parsed = diff_model.as_parsed(diff_content)
+    files = parsed.files
+    categories, scans = local_commit.analyze_files(parsed)
+
+    match = CONVENTIONAL_PATTERN.match(commit_message or "")
+    if match:
+        commit_type = match.group(1).lower()
+    elif files:
+        commit_type = local_commit.infer_commit_type(files, categories, scans)
+    else:
+        commit_type = None
+
+    return {
+        'files': files,
+        'commit_type': commit_type,
+        'breaking': bool(match and match.group(2)) or 'BREAKING CHANGE' in (commit_message or ""),
+        'has_tests': 'test' in categories,
+        'has_docs': 'docs' in categories,
+    }
+
+def analyze_commits(commit_messages, pr_title, files):
+    """
+    Mengumpulkan fakta untuk section lokal dari pesan-pesan commit branch dan daftar file yang berubah,
+    tanpa membaca diff. Tipe diambil dari judul PR, atau tipe conventional yang paling sering dipakai commit.
+    """
+    categories = [local_commit.classify_path(f.path) for f in files]
+    types = []
+    breaking = False
+    for message in [pr_title or ""] + [m or "" for m in commit_messages]:
+        match = CONVENTIONAL_PATTERN.match(message)
+        if match:
+            types.append(match.group(1).lower())
+            breaking = breaking or bool(match.group(2))
+        breaking = breaking or 'BREAKING CHANGE' in message
+
+    title_match = CONVENTIONAL_PATTERN.match(pr_title or "")
+    if title_match:
+        commit_type = title_match.group(1).lower()
+    else:
+        commit_type = Counter(types).most_common(1)[0][0] if types else None
+
+    return {
+        'files': files,
+        'commit_type': commit_type,
+        'breaking': breaking,
+        'has_tests': 'test' in categories,
+        'has_docs': 'docs' in categories,
+    }
+
+def needs_file_stats(sections):
+    """Mengecek apakah template memiliki section daftar file yang membutuhkan diffstat."""
+    return any(section['kind'] == 'files' for section in sections)
+
+def context_section_indexes(sections, narrative):
+    """
+    Menentukan section naratif yang menerima konteks tambahan: section berjudul deskripsi/ringkasan,
+    atau section naratif pertama jika tidak ada yang cocok.
+    """
+    matched = [i for i in narrative if sections[i]['title'].lower() in CONTEXT_SECTION_TITLES]
+    return set(matched or narrative[:1])
+
+def is_checkbox_relevant(label, analysis):
+    """Memutuskan apakah sebuah checkbox layak dicentang berdasarkan hasil analisis diff."""
+    label = label.lower()
+    commit_type = analysis['commit_type']
+    if label.startswith('breaking change'):
+        return analysis['breaking']
+    if label.startswith('bug fix'):
+        return commit_type == 'fix' and not analysis['breaking']
+    if label.startswith('new feature'):
+        return commit_type == 'feat' and not analysis['breaking']
+    if 'documentation' in label:
+        return analysis['has_docs']
+    if 'added tests' in label:
+        return analysis['has_tests']
+    return False
+
+def fill_checkbox_section(section, analysis):
+    """Mencentang checkbox yang relevan secara lokal tanpa mengubah struktur section."""
+    lines = []
+    for line in section['lines']:
+        match = CHECKBOX_PATTERN.match(line)
+        if match:
+            mark = 'x' if is_checkbox_relevant(match.group(3), analysis) else ' '
+            line = f"{match.group(1)}[{mark}]{match.group(2)}{match.group(3)}"
+        lines.append(line)
+    return "\n".join(lines).strip()
+
+def fill_files_section(analysis):
+    """Membuat daftar file yang berubah beserta status dan diffstat-nya."""
+    status_labels = {'A': 'added', 'D': 'deleted', 'R': 'renamed', 'M': 'modified'}
+    lines = []
+    for f in analysis['files']:
+        path = f.path if f.status != 'R' else f"{f.old_path} → {f.path}"
+        stats = "binary" if f.binary else f"+{f.added}/-{f.deleted}"
+        lines.append(f"- `{path}` ({status_labels[f.status]}, {stats})")
+    return "\n".join(lines) or "Tidak ada."
+
+def fill_local_section(section, analysis):
+    """Mengisi section yang tidak membutuhkan model. Mengembalikan None untuk section naratif."""
+    kind = section['kind']
+    if kind in ('static', 'manual'):
+        return section['body']
+    if kind == 'checkbox':
+        return fill_checkbox_section(section, analysis)
+    if kind == 'files':
+        return fill_files_section(analysis)
+    return None
+
+def assemble_body(sections, contents):
+    """Menyusun PR body akhir dengan urutan dan header section yang sama persis dengan template."""
+    parts = []
+    for section, content in zip(sections, contents):
+        if section['heading'] is None:
+            parts.append(content)
+        else:
+            parts.append(f"{section['heading']}\n\n{content}" if content else section['heading'])
+    return "\n\n".join(parts).strip() + "\n"
+
+def merge_update_into_body(body, update_text):
+    """
+    Menambahkan teks pembaruan ke body PR yang sudah ada tanpa mengubah isi sebelumnya.
+    Pembaruan dikumpulkan di satu section 'Updates' di akhir body, ditandai komentar HTML.
+    """
+    body = (body or "").rstrip()
+    if UPDATES_MARKER in body:
+        return f"{body}\n\n{update_text.strip()}\n"
+    return f"{body}\n\n{UPDATES_HEADING}\n{UPDATES_MARKER}\n\n{update_text.strip()}\n"
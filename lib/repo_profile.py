@@ -0,0 +1,187 @@
+import json
+import os
+import re
+
+from lib import git_utils
+
+PROFILE_FILENAME = 'acpr_profile.json'
+PROFILE_VERSION = 1
+# Batas jumlah commit yang dipindai saat profil dibangun dari awal
+MAX_INITIAL_COMMITS = 2000
+
+CONVENTIONAL_PATTERN = re.compile(r'^(\w+)(?:\(([^)]+)\))?(!)?:\s*(.+)$')
+
+def get_profile_path():
+    """Mendapatkan path file profil repository di dalam direktori .git."""
+    git_dir = git_utils.get_git_dir()
+    if not git_dir:
+        return None
+    return os.path.join(git_dir, PROFILE_FILENAME)
+
+def empty_profile():
+    """Membuat profil kosong."""
+    return {
+        'version': PROFILE_VERSION,
+        'last_commit': None,
+        'commit_count': 0,
+        'conventional_count': 0,
+        'type_counts': {},
+        'scope_counts': {},
+        'subject_lengths': {},
+    }
+
+def module_keys(path):
+    """Mendapatkan kunci modul untuk sebuah path: path file itu sendiri dan direktori induknya."""
+    keys = [path]
+    directory = os.path.dirname(path)
+    while directory:
+        keys.append(directory + '/')
+        directory = os.path.dirname(directory)
+    return keys
+
+def add_commits_to_profile(profile, commits):
+    """Menambahkan statistik dari daftar commit (hash, subject, files) ke profil."""
+    for _, subject, files in commits:
+        profile['commit_count'] += 1
+        length = str(len(subject))
+        profile['subject_lengths'][length] = profile['subject_lengths'].get(length, 0) + 1
+
+        match = CONVENTIONAL_PATTERN.match(subject)
+        if not match:
+            continue
+        profile['conventional_count'] += 1
+        commit_type, scope = match.group(1).lower(), match.group(2)
+        profile['type_counts'][commit_type] = profile['type_counts'].get(commit_type, 0) + 1
+        if not scope:
+            continue
+        for path in files:
+            for key in module_keys(path):
+                scopes = profile['scope_counts'].setdefault(key, {})
+                scopes[scope] = scopes.get(scope, 0) + 1
+
+def save_repo_profile(profile, profile_path):
+    """Menyimpan profil repository ke file JSON."""
+    try:
+        with open(profile_path, 'w', encoding='utf-8') as f:
+            json.dump(profile, f, ensure_ascii=False)
+    except OSError as e:
+        print(f"⚠️ Gagal menyimpan profil repository: {e}")
+
+def load_repo_profile(cached_only=False):
+    """
+    Memuat profil repository dari cache di .git dan memperbaruinya hanya dengan commit baru.
+    Profil dibangun ulang jika cache tidak ada, versinya berbeda, atau riwayat telah ditulis ulang.
+    Dengan `cached_only`, profil di cache dikembalikan apa adanya tanpa menjalankan `git log`
+    (None jika belum ada), untuk pemanggil dengan batas waktu ketat seperti hook.
+    """
+    profile_path = get_profile_path()
+    if not profile_path:
+        return None
+
+    profile = None
+    if os.path.exists(profile_path):
+        try:
+            with open(profile_path, 'r', encoding='utf-8') as f:
+                profile = json.load(f)
+        except (OSError, ValueError):
+            profile = None
+    if cached_only:
+        return profile if profile and profile.get('version') == PROFILE_VERSION else None
+
+    head = git_utils.get_last_commit_hash()
+    if not head:
+        return profile
+
+    if profile and profile.get('version') == PROFILE_VERSION and profile.get('last_commit'):
+        if profile['last_commit'] == head:
+            return profile
+        if git_utils.is_ancestor(profile['last_commit'], head):
+            commits = git_utils.get_log_with_files(f"{profile['last_commit']}..{head}")
+        else:
+            profile = None
+    else:
+        profile = None
+
+    if profile is None:
+        print("🔎 Membangun profil repository dari riwayat commit...")
+        profile = empty_profile()
+        commits = git_utils.get_log_with_files(head, max_count=MAX_INITIAL_COMMITS)
+
+    if commits is None:
+        return profile
+    add_commits_to_profile(profile, commits)
+    profile['last_commit'] = head
+    save_repo_profile(profile, profile_path)
+    return profile
+
+def suggest_scope(profile, paths):
+    """
+    Menyarankan scope untuk file yang berubah berdasarkan scope yang pernah dipakai pada modul yang sama.
+    Kecocokan path file lebih diutamakan daripada kecocokan direktori.
+    """
+    if not profile or not paths:
+        return None
+    votes = {}
+    for path in paths:
+        for depth, key in enumerate(module_keys(path)):
+            scopes = profile['scope_counts'].get(key)
+            if not scopes:
+                continue
+            # Kecocokan yang lebih spesifik (depth kecil) mendapat bobot lebih besar
+            weight = 1.0 / (depth + 1)
+            for scope, count in scopes.items():
+                votes[scope] = votes.get(scope, 0) + count * weight
+            break
+    if not votes:
+        return None
+    best = max(sorted(votes), key=votes.get)
+    # Hanya sarankan scope jika didukung mayoritas suara, bukan sekadar seri
+    if votes[best] * 2 <= sum(votes.values()):
+        return None
+    return best
+
+def common_types(profile, limit=5):
+    """Mengembalikan tipe conventional commit yang paling sering dipakai."""
+    if not profile:
+        return []
+    type_counts = profile['type_counts']
+    return sorted(type_counts, key=lambda t: (-type_counts[t], t))[:limit]
+
+def typical_subject_length(profile):
+    """Mengembalikan median panjang subject commit, atau None jika belum ada data."""
+    if not profile or not profile['subject_lengths']:
+        return None
+    lengths = sorted((int(length), count) for length, count in profile['subject_lengths'].items())
+    middle = sum(count for _, count in lengths) / 2
+    seen = 0
+    for length, count in lengths:
+        seen += count
+        if seen >= middle:
+            return length
+    return None
+
+def build_prompt_hint(profile, paths):
+    """Membuat petunjuk singkat konvensi repository untuk disisipkan ke prompt."""
+    if not profile or not profile['conventional_count']:
+        return ""
+    hints = []
+    types = common_types(profile)
+    if types:
+        hints.append(f"tipe umum: {', '.join(types)}")
+    scope = suggest_scope(profile, paths)
+    if scope:
+        hints.append(f"scope: {scope}")
+    length = typical_subject_length(profile)
+    if length:
+        hints.append(f"panjang ±{length} karakter")
+    return "; ".join(hints)
+
+def apply_scope(commit_message, scope):
+    """Menambahkan scope ke pesan conventional commit yang belum memiliki scope."""
+    if not commit_message or not scope:
+        return commit_message
+    match = CONVENTIONAL_PATTERN.match(commit_message)
+    if not match or match.group(2):
+        return commit_message
+    breaking = match.group(3) or ''
+    return f"{match.group(1)}({scope}){breaking}: {match.group(4)}"
@@ -1,16 +1,12 @@
 import argparse
+import json
 import os
+import re
 import sys
-from lib import ai_utils, config, git_utils, utils
+from lib import ai_utils, config, diff_model, git_utils, local_commit, pr_template, repo_profile, utils
 
 def main():
     """Fungsi utama untuk menjalankan alur kerja git acp otomatis."""
-    try:
-        config.configure_api()
-    except ValueError as e:
-        print(f"❌ Error Konfigurasi: {e}")
-        sys.exit(1)
-
     # Parser sementara untuk mendapatkan path file konfigurasi
     conf_parser = argparse.ArgumentParser(
         description='Git ACPR Automatic Helper.',
@@ -34,6 +30,10 @@ def main():
     default_auto_save_diff = app_config.get('auto-save-diff', 'false').lower() == 'true'
     default_folder_diff = app_config.get('folder-diff', 'diff')
     default_reviewer = app_config.get('reviewer', '')
+    default_fast = app_config.get('fast', 'false').lower() == 'true'
+    default_commit_timeout = float(app_config.get('commit-timeout', 30))
+    default_cache_url = app_config.get('cache-url', '')
+    default_repo_profile = app_config.get('repo-profile', 'true').lower() == 'true'
 
     # Parser utama yang menggunakan nilai default dari konfigurasi
     parser = argparse.ArgumentParser(
@@ -48,9 +48,29 @@ def main():
     parser.add_argument("--auto-save-diff", action="store_true", default=default_auto_save_diff, help=f"Simpan diff commit ke file. Default: {default_auto_save_diff}")
     parser.add_argument("--folder-diff", type=str, default=default_folder_diff, help=f"Folder untuk menyimpan file diff. Default: {default_folder_diff}")
     parser.add_argument("--reviewer", type=str, default=default_reviewer, help=f"Username GitHub untuk reviewer PR. Default: {default_reviewer}")
+    parser.add_argument("--fast", action="store_true", default=default_fast, help=f"Buat pesan commit secara lokal tanpa memanggil Gemini. Default: {default_fast}")
+    parser.add_argument("--commit-timeout", type=float, default=default_commit_timeout, help=f"Batas waktu (detik) menunggu Gemini sebelum memakai generator lokal. Default: {default_commit_timeout}")
+    parser.add_argument("--cache-url", type=str, default=default_cache_url, help=f"URL service cache LLM bersama (kosong = nonaktif). Default: {default_cache_url or '-'}")
+    parser.add_argument("--no-repo-profile", dest="repo_profile", action="store_false", default=default_repo_profile, help=f"Jangan gunakan profil konvensi commit dari riwayat repository. Default aktif: {default_repo_profile}")
     parser.add_argument("--steps", type=str, default="acp", help="Langkah yang akan dijalankan: a(add), c(commit), p(push), pr(pull request). Contoh: 'acp'. Default: 'acp'")
     args = parser.parse_args(remaining_argv)
 
+    try:
+        config.configure_api()
+    except ValueError as e:
+        # Mode --fast tetap bisa membuat commit tanpa API key, selama tidak membuat PR
+        if not (args.fast and 'pr' not in args.steps.lower()):
+            print(f"❌ Error Konfigurasi: {e}")
+            sys.exit(1)
+        print(f"⚠️  {e} Melanjutkan dengan generator pesan commit lokal.")
+
+    ai_utils.configure_cache(
+        args.cache_url,
+        ttl=app_config.get('cache-ttl'),
+        timeout=app_config.get('cache-timeout'),
+        token=app_config.get('cache-token'),
+    )
+
     # --- PENGECEKAN UKURAN FOLDER ---
     total_size_bytes = utils.get_directory_size()
     total_size_kb = total_size_bytes / 1024
@@ -83,7 +103,8 @@ def main():
     else:
         print("ℹ️ Langkah 'add' dilewati.")
 
-    diff = git_utils.get_git_diff()
+    # Diff di-parse sekali dan dipakai bersama oleh semua tahap berikutnya
+    diff = diff_model.parse_diff(git_utils.get_git_diff())
 
     # --- Jalur 1: Ada perubahan baru yang di-stage ---
     if not diff:
@@ -94,6 +115,8 @@ def main():
             # Ambil info untuk PR SEBELUM push, karena setelah push diff akan kosong
             diff_for_pr = git_utils.get_diff_for_unpushed_commits()
             commit_msg_for_pr = git_utils.get_last_commit_message()
+            # Commit yang sudah ada di remote sebelum push = commit yang sudah dicakup PR terbuka
+            pushed_commit = git_utils.get_pushed_commit(current_branch) if 'pr' in steps else None
 
             if 'p' in steps:
                 if not git_utils.git_push(current_branch): return
@@ -102,7 +125,7 @@ def main():
                 return
 
             if 'pr' in steps:
-                create_pr_flow(diff_for_pr, commit_msg_for_pr, current_branch, args)
+                create_pr_flow(diff_for_pr, commit_msg_for_pr, current_branch, args, covered_commit=pushed_commit)
             else:
                 print("ℹ️ Langkah 'pull request' dilewati.")
         elif 'pr' in steps:
@@ -110,11 +133,11 @@ def main():
             print("ℹ️ Tidak ada perubahan baru atau commit yang belum di-push.")
             print("ℹ️ Mencoba membuat PR untuk branch saat ini terhadap target branch...")
             
-            # Cek apakah ada perbedaan dengan target branch
-            diff_for_pr = git_utils.get_diff_against_branch(args.target_branch)
-            commits_info = git_utils.get_commits_against_branch(args.target_branch)
-            
-            if not diff_for_pr and not commits_info:
+            # Cek apakah ada perbedaan dengan target branch (tanpa mengambil diff lengkap)
+            has_changes = git_utils.has_changes_against_branch(args.target_branch)
+            if has_changes is None:
+                return
+            if not has_changes:
                 print(f"ℹ️ Tidak ada perbedaan antara branch saat ini dan '{args.target_branch}'.")
                 print("   Tidak ada yang perlu di-PR.")
                 return
@@ -123,14 +146,42 @@ def main():
             commit_msg_for_pr = git_utils.get_last_commit_message()
             if not commit_msg_for_pr:
                 commit_msg_for_pr = f"PR: {current_branch} to {args.target_branch}"
-            
-            create_pr_flow(diff_for_pr, commit_msg_for_pr, current_branch, args)
+
+            # PR yang sudah terbuka cukup diperbarui dengan commit baru
+            existing_pr = git_utils.get_existing_pull_request(current_branch)
+            if existing_pr and current_branch != args.target_branch:
+                update_pr_flow(existing_pr, current_branch, args)
+                return
+
+            # Bangun PR body dari ringkasan per commit, bukan dari diff penuh branch
+            commit_summaries = summarize_branch_commits(args.target_branch, args.model, args.folder_diff)
+            # Diff lengkap hanya diambil oleh create_pr_flow jika benar-benar dibutuhkan prompt
+            create_pr_flow(
+                None, commit_msg_for_pr, current_branch, args,
+                commit_summaries=commit_summaries, check_existing=False
+            )
         return # Selesai, karena tidak ada perubahan baru untuk di-commit
 
     # --- Langkah C: Commit ---
     commit_message = None
     if 'c' in steps:
-        commit_message = ai_utils.generate_commit_message(diff, args.model)
+        # Profil repository memberi konvensi tipe/scope dari riwayat commit
+        profile = repo_profile.load_repo_profile() if args.repo_profile else None
+        changed_paths = diff.paths()
+        scope = repo_profile.suggest_scope(profile, changed_paths)
+
+        if args.fast:
+            print("⚡ Membuat pesan commit secara lokal (mode --fast)...")
+            commit_message = local_commit.generate_local_commit_message(diff)
+        else:
+            repo_hint = repo_profile.build_prompt_hint(profile, changed_paths)
+            commit_message = ai_utils.generate_commit_message(
+                diff, args.model, timeout=args.commit_timeout, repo_hint=repo_hint
+            )
+            if not commit_message:
+                print("⚠️ Menggunakan generator pesan commit lokal sebagai fallback...")
+                commit_message = local_commit.generate_local_commit_message(diff)
+        commit_message = repo_profile.apply_scope(commit_message, scope)
         if not commit_message:
             print("Gagal membuat pesan commit otomatis. Proses dihentikan.")
             return
@@ -158,6 +209,7 @@ def main():
 
     # --- Langkah P: Push ---
     if 'p' in steps:
+        pushed_commit = git_utils.get_pushed_commit(current_branch) if 'pr' in steps else None
         if not git_utils.git_push(current_branch): return
     else:
         print("ℹ️ Langkah 'push' dilewati. Tidak dapat melanjutkan ke PR.")
@@ -165,7 +217,7 @@ def main():
 
     # --- Langkah PR: Pull Request ---
     if 'pr' in steps:
-        create_pr_flow(diff, commit_message, current_branch, args)
+        create_pr_flow(diff, commit_message, current_branch, args, covered_commit=pushed_commit)
     else:
         print("ℹ️ Langkah 'pull request' dilewati.")
 
@@ -189,7 +241,7 @@ def save_commit_diff(diff, folder_diff):
         
         # Simpan diff ke file
         with open(diff_filepath, 'w', encoding='utf-8') as f:
-            f.write(diff)
+            f.write(str(diff))
         
         print(f"💾 Diff commit disimpan ke: {diff_filepath}")
         
@@ -236,8 +288,8 @@ def collect_unused_diffs_for_pr(folder_diff, current_diff_hash=None, limit=3):
         unused_diffs = []
         for filename in os.listdir(folder_diff):
             if filename.endswith('.diff') and filename not in used_files:
-                # Skip current diff jika ada
-                if current_diff_hash and filename.startswith(current_diff_hash[:8]):
+                # Skip current diff jika ada (nama file adalah 8 karakter pertama hash commit)
+                if current_diff_hash and os.path.splitext(filename)[0] == current_diff_hash[:8]:
                     continue
                     
                 filepath = os.path.join(folder_diff, filename)
@@ -252,12 +304,13 @@ def collect_unused_diffs_for_pr(folder_diff, current_diff_hash=None, limit=3):
         for filepath, filename, _ in selected_diffs:
             try:
                 with open(filepath, 'r', encoding='utf-8') as f:
-                    diff_content = f.read()
-                    hash_part = filename.replace('.diff', '')
+                    # Batasi panjang untuk efisiensi prompt; hanya bagian yang dipakai yang dibaca
+                    diff_content = f.read(1500)
+                    hash_part = os.path.splitext(filename)[0]
                     diff_contexts.append({
                         'filename': filename,
                         'hash': hash_part,
-                        'content': diff_content[:1500]  # Batasi panjang untuk efisiensi prompt
+                        'content': diff_content
                     })
             except Exception as e:
                 print(f"⚠️ Gagal membaca unused diff file {filepath}: {e}")
@@ -270,14 +323,206 @@ def collect_unused_diffs_for_pr(folder_diff, current_diff_hash=None, limit=3):
         print(f"⚠️ Error saat mengumpulkan unused diffs: {e}")
         return []
 
-def create_pr_flow(diff, commit_message, current_branch, args):
-    """Mengatur alur pembuatan Pull Request."""
+def get_summary_cache_file():
+    """Mendapatkan path file cache ringkasan commit di dalam direktori .git"""
+    git_dir = git_utils.get_git_dir()
+    return os.path.join(git_dir, 'acpr_commit_summaries.json') if git_dir else None
+
+def get_summary_cache_key(commit_hash, model_name):
+    """Kunci cache ringkasan commit: nama model dan hash commit"""
+    return f"{model_name}:{commit_hash}"
+
+def load_commit_summaries(cache_file):
+    """Memuat ringkasan commit yang sudah pernah dibuat, dalam bentuk dict {model:hash: ringkasan}"""
+    if not cache_file or not os.path.exists(cache_file):
+        return {}
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Gagal membaca cache ringkasan commit: {e}")
+        return {}
+
+def save_commit_summaries(summaries, cache_file):
+    """Menyimpan ringkasan commit ke file cache"""
+    if not cache_file:
+        return
+    try:
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump(summaries, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        print(f"⚠️ Gagal menyimpan cache ringkasan commit: {e}")
+
+def read_saved_commit_diff(commit_hash, folder_diff):
+    """Membaca diff yang sudah disimpan oleh auto-save-diff untuk commit tertentu, jika ada"""
+    diff_filepath = os.path.join(folder_diff, f"{commit_hash[:8]}.diff")
+    if not os.path.exists(diff_filepath):
+        return None
+    try:
+        with open(diff_filepath, 'r', encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        return None
+
+def summarize_commits(commits, model_name, folder_diff):
+    """
+    Membuat ringkasan untuk daftar commit (hash, pesan).
+    Hanya commit yang belum pernah diringkas yang dikirim ke model; sisanya diambil dari cache.
+    """
+    if not commits:
+        return []
+
+    cache_file = get_summary_cache_file()
+    cached = load_commit_summaries(cache_file)
+    pending = [(h, m) for h, m in commits if get_summary_cache_key(h, model_name) not in cached]
+    print(f"📋 {len(commits)} commit ditemukan, {len(commits) - len(pending)} ringkasan diambil dari cache, {len(pending)} akan diringkas.")
+
+    for index, (commit_hash, message) in enumerate(pending, 1):
+        commit_diff = diff_model.parse_diff(
+            read_saved_commit_diff(commit_hash, folder_diff) or git_utils.get_commit_diff(commit_hash)
+        )
+        if not commit_diff:
+            continue
+        print(f"   [{index}/{len(pending)}] Meringkas commit {commit_hash[:8]}...")
+        summary = ai_utils.generate_commit_summary(message, commit_diff, model_name)
+        if summary:
+            cached[get_summary_cache_key(commit_hash, model_name)] = summary
+            # Simpan setiap ringkasan baru agar tidak hilang jika proses terhenti
+            save_commit_summaries(cached, cache_file)
+
+    # Commit yang gagal diringkas tetap disertakan dengan pesan commit-nya
+    return [
+        {
+            'hash': h, 'message': m,
+            'summary': cached.get(get_summary_cache_key(h, model_name), f"- {m.splitlines()[0] if m else h[:8]}"),
+        }
+        for h, m in commits
+    ]
+
+def summarize_branch_commits(target_branch, model_name, folder_diff):
+    """Membuat ringkasan per commit untuk semua commit branch terhadap target branch."""
+    return summarize_commits(git_utils.get_commit_list_against_branch(target_branch), model_name, folder_diff)
+
+def get_pr_state_file():
+    """Mendapatkan path file yang mencatat commit terakhir yang sudah dideskripsikan di PR per branch"""
+    git_dir = git_utils.get_git_dir()
+    return os.path.join(git_dir, 'acpr_pr_state.json') if git_dir else None
+
+def load_pr_state():
+    """Memuat catatan PR per branch dalam bentuk dict {branch: {'number', 'last_commit'}}"""
+    state_file = get_pr_state_file()
+    if not state_file or not os.path.exists(state_file):
+        return {}
+    try:
+        with open(state_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Gagal membaca catatan PR: {e}")
+        return {}
+
+def save_pr_state(branch, pr_number, last_commit):
+    """Mencatat commit terakhir yang sudah dideskripsikan di PR untuk sebuah branch"""
+    state_file = get_pr_state_file()
+    if not state_file:
+        return
+    state = load_pr_state()
+    state[branch] = {'number': pr_number, 'last_commit': last_commit}
+    try:
+        with open(state_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+    except OSError as e:
+        print(f"⚠️ Gagal menyimpan catatan PR: {e}")
+
+def parse_pr_number(pr_url):
+    """Mengambil nomor PR dari URL yang dikembalikan 'gh pr create'"""
+    match = re.search(r'/pull/(\d+)', pr_url or "")
+    return int(match.group(1)) if match else None
+
+def update_pr_flow(existing_pr, current_branch, args, covered_commit=None):
+    """
+    Memperbarui PR yang sudah ada: hanya commit yang ditambahkan sejak deskripsi terakhir
+    yang diringkas, lalu digabungkan ke body PR yang ada dan PR diedit di tempat.
+    Catatan hanya dipakai jika nomor PR-nya sama persis. PR tanpa catatan dicatat di
+    `covered_commit` (ujung branch di remote sebelum push pada run ini) lalu commit setelahnya
+    diringkas; tanpa `covered_commit` (tidak ada yang di-push) PR dicatat di HEAD tanpa diubah.
+    """
+    pr_number = existing_pr['number']
+    print(f"\n--- Memperbarui Pull Request #{pr_number} yang sudah ada ---")
+    print(f"   {existing_pr.get('url', '')}")
+
+    head = git_utils.get_last_commit_hash()
+    state = load_pr_state().get(current_branch)
+    if not state or state.get('number') != pr_number or not state.get('last_commit'):
+        # PR dibuat manual atau oleh versi lama: deskripsi yang ada hanya mencakup commit yang
+        # sudah di-push sebelum run ini, sehingga commit yang baru di-push tetap diringkas
+        if covered_commit and covered_commit != head and git_utils.is_ancestor(covered_commit, head):
+            save_pr_state(current_branch, pr_number, covered_commit)
+            state = {'number': pr_number, 'last_commit': covered_commit}
+            print(f"ℹ️ Belum ada catatan deskripsi untuk PR #{pr_number}. Deskripsi yang ada dianggap mencakup {covered_commit[:8]};")
+            print("   commit yang baru di-push akan ditambahkan.")
+        else:
+            save_pr_state(current_branch, pr_number, head)
+            print(f"ℹ️ Belum ada catatan deskripsi untuk PR #{pr_number}. Deskripsi yang ada dianggap mencakup commit saat ini;")
+            print("   commit yang ditambahkan setelah ini akan diringkas pada pembaruan berikutnya.")
+            return
+    if state['last_commit'] == head:
+        print("ℹ️ Deskripsi PR sudah mencakup commit terbaru. Tidak ada yang perlu diperbarui.")
+        return
+    if git_utils.is_ancestor(state['last_commit'], head):
+        revision_range = f"{state['last_commit']}..HEAD"
+    else:
+        print("⚠️ Riwayat branch telah ditulis ulang sejak deskripsi terakhir, meringkas semua commit branch.")
+        revision_range = f"{existing_pr.get('baseRefName') or args.target_branch}..HEAD"
+
+    commit_summaries = summarize_commits(git_utils.get_commit_list(revision_range), args.model, args.folder_diff)
+    if not commit_summaries:
+        print("ℹ️ Tidak ada commit baru untuk ditambahkan ke deskripsi PR.")
+        return
+
+    first, last = commit_summaries[0]['hash'][:8], commit_summaries[-1]['hash'][:8]
+    update_lines = [f"### {first}..{last}" if first != last else f"### {first}"]
+    for item in commit_summaries:
+        update_lines.append(f"**{item['message'].splitlines()[0] if item['message'] else item['hash'][:8]}**")
+        update_lines.append(item['summary'])
+    final_pr_body = pr_template.merge_update_into_body(existing_pr.get('body'), "\n\n".join(update_lines))
+
+    print("\n" + "="*10 + " PR Update Preview " + "="*10)
+    print(final_pr_body)
+    print("=" * 39)
+
+    try:
+        confirm_pr = input(f"\n❓ Perbarui Pull Request #{pr_number} dengan konten di atas? (y/n): ")
+        if confirm_pr.lower() != 'y':
+            print("ℹ️ Pembaruan Pull Request dibatalkan.")
+            return
+    except KeyboardInterrupt:
+        print("\nOperasi dibatalkan oleh pengguna.")
+        return
+
+    if git_utils.edit_pull_request(pr_number, final_pr_body):
+        save_pr_state(current_branch, pr_number, head)
+
+def create_pr_flow(diff, commit_message, current_branch, args, commit_summaries=None, check_existing=True,
+                   covered_commit=None):
+    """
+    Mengatur alur pembuatan Pull Request.
+    Jika `commit_summaries` diberikan, PR body dibangun dari ringkasan per commit tersebut
+    dan `diff` boleh None (diff terhadap target branch baru diambil jika diperlukan).
+    Jika PR untuk branch ini sudah terbuka, PR tersebut diperbarui secara inkremental;
+    `covered_commit` adalah ujung branch di remote sebelum push (lihat `update_pr_flow`).
+    """
     # Pengecekan branch target (ini adalah implementasi dari permintaan Anda)
     if current_branch == args.target_branch:
         print(f"ℹ️ Branch saat ini ('{current_branch}') sama dengan branch target ('{args.target_branch}').")
         print("   Pull Request tidak dibuat untuk menghindari PR ke branch yang sama.")
         return
 
+    if check_existing:
+        existing_pr = git_utils.get_existing_pull_request(current_branch)
+        if existing_pr:
+            update_pr_flow(existing_pr, current_branch, args, covered_commit)
+            return
+
     print("\n--- Membuat Pull Request ---")
     template_content = utils.read_file_content(args.pr_template)
     if not template_content:
@@ -286,19 +531,45 @@ def create_pr_flow(diff, commit_message, current_branch, args):
 
     # Dapatkan hash commit saat ini untuk tracking
     current_commit_hash = git_utils.get_last_commit_hash()
-    
-    # Kumpulkan diff files yang belum digunakan untuk PR
-    print("📋 Mengumpulkan diff files yang belum digunakan untuk PR...")
-    unused_diffs = collect_unused_diffs_for_pr(args.folder_diff, current_commit_hash, limit=3)
-    
-    # Gunakan AI untuk mengisi template dengan strict adherence dan unused diffs
-    final_pr_body = ai_utils.generate_strict_template_pr_body(
-        diff, args.model, commit_message, template_content, unused_diffs
-    )
+
+    if commit_summaries:
+        # Diff tiap commit sudah terwakili oleh ringkasannya
+        unused_diffs = [
+            {'filename': f"{item['hash'][:8]}.diff"}
+            for item in commit_summaries
+            if os.path.exists(os.path.join(args.folder_diff, f"{item['hash'][:8]}.diff"))
+        ]
+        # Ringkasan kelompok (branch panjang) memakai cache yang sama dengan ringkasan per commit
+        summary_cache_file, summary_cache = None, None
+        if len(commit_summaries) > ai_utils.SUMMARY_GROUP_SIZE:
+            summary_cache_file = get_summary_cache_file()
+            summary_cache = load_commit_summaries(summary_cache_file)
+            cached_count = len(summary_cache)
+        final_pr_body = ai_utils.generate_pr_body_from_summaries(
+            commit_summaries, args.model, commit_message, template_content,
+            load_files=lambda with_stats: git_utils.get_branch_file_changes(args.target_branch, with_stats),
+            summary_cache=summary_cache
+        )
+        if summary_cache is not None and len(summary_cache) != cached_count:
+            save_commit_summaries(summary_cache, summary_cache_file)
+    else:
+        if diff is None:
+            diff = git_utils.get_diff_against_branch(args.target_branch)
+
+        # Kumpulkan diff files yang belum digunakan untuk PR
+        print("📋 Mengumpulkan diff files yang belum digunakan untuk PR...")
+        unused_diffs = collect_unused_diffs_for_pr(args.folder_diff, current_commit_hash, limit=3)
+
+        # Gunakan AI untuk mengisi template dengan strict adherence dan unused diffs
+        final_pr_body = ai_utils.generate_strict_template_pr_body(
+            diff, args.model, commit_message, template_content, unused_diffs
+        )
     
     # Fallback ke metode lama jika fungsi baru tidak tersedia
     if not final_pr_body:
         print("⚠️ Menggunakan metode standar untuk membuat PR body...")
+        if diff is None:
+            diff = git_utils.get_diff_against_branch(args.target_branch)
         final_pr_body = ai_utils.generate_pr_body(diff, args.model, commit_message, template_content)
     
     if not final_pr_body:
@@ -326,10 +597,18 @@ def create_pr_flow(diff, commit_message, current_branch, args):
         return
 
     # Buat Pull Request
-    pr_success = git_utils.create_pull_request(args.target_branch, pr_title, final_pr_body, args.reviewer)
+    pr_url = git_utils.create_pull_request(args.target_branch, pr_title, final_pr_body, args.reviewer)
     
     # Tandai diff files sebagai sudah digunakan untuk PR jika berhasil
-    if pr_success:
+    if pr_url is not None:
+        # Catat commit terakhir yang sudah dideskripsikan untuk pembaruan PR berikutnya
+        pr_number = parse_pr_number(pr_url)
+        if pr_number is None:
+            created_pr = git_utils.get_existing_pull_request(current_branch)
+            pr_number = created_pr['number'] if created_pr else None
+        if pr_number is not None:
+            save_pr_state(current_branch, pr_number, current_commit_hash)
+
         # Mark current commit's diff as used
         if current_commit_hash:
             current_diff_filename = f"{current_commit_hash[:8]}.diff"
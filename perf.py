@@ -0,0 +1,474 @@
+import argparse
+import builtins
+import fnmatch
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PERF_DIR = os.path.join(SCRIPT_DIR, 'perf')
+WORKLOADS_DIR = os.path.join(PERF_DIR, 'workloads')
+BASELINES_PATH = os.path.join(PERF_DIR, 'baselines.json')
+# Placeholder untuk direktori .git rekaman, diganti dengan direktori sementara saat replay
+GIT_DIR_PLACEHOLDER = '{git_dir}'
+GIT_DIR_COMMAND = ['git', 'rev-parse', '--absolute-git-dir']
+# Argumen yang nilainya berasal dari hasil model (judul/body PR, pesan commit); direkam sebagai wildcard
+GENERATED_VALUE_FLAGS = ('--title', '--body', '-m')
+# Entry point yang bisa direkam dan diputar ulang
+ENTRIES = ('main', 'hook')
+
+# Fungsi pipeline yang diukur waktunya: nama fase -> (modul, nama fungsi)
+PHASES = {
+    'git_diff': ('lib.git_utils', 'get_git_diff'),
+    'branch_comparison': ('lib.git_utils', 'get_branch_comparison'),
+    'repo_profile': ('lib.repo_profile', 'load_repo_profile'),
+    'commit_message': ('lib.ai_utils', 'generate_commit_message'),
+    'local_commit_message': ('lib.local_commit', 'generate_local_commit_message'),
+    'git_commit': ('lib.git_utils', 'git_commit'),
+    'git_push': ('lib.git_utils', 'git_push'),
+    'commit_summaries': ('main', 'summarize_commits'),
+    'pr_body': ('lib.ai_utils', 'generate_strict_template_pr_body'),
+    'pr_body_from_summaries': ('lib.ai_utils', 'generate_pr_body_from_summaries'),
+    'create_pr': ('lib.git_utils', 'create_pull_request'),
+    'update_pr': ('main', 'update_pr_flow'),
+    'hook_message': ('hook', 'generate_hook_message'),
+}
+
+# Toleransi relatif dan absolut terhadap baseline per jenis metrik
+TIME_TOLERANCE = (0.25, 20.0)
+COUNT_TOLERANCE = (0.0, 0)
+TOKEN_TOLERANCE = (0.05, 50)
+MEMORY_TOLERANCE = (0.25, 512)
+
+def estimate_tokens(text):
+    """Perkiraan jumlah token prompt (±4 karakter per token) tanpa tokenizer."""
+    return (len(text) + 3) // 4
+
+def args_match(pattern, args):
+    """Mencocokkan argumen command dengan pola rekaman; setiap elemen pola mendukung wildcard '*'."""
+    if len(pattern) != len(args):
+        return False
+    return all(fnmatch.fnmatchcase(str(arg), expected) for expected, arg in zip(pattern, args))
+
+class SubprocessReplayer:
+    """Pengganti `subprocess.run` yang memutar ulang output command dari rekaman beserta latensinya."""
+
+    def __init__(self, calls, latency_scale, metrics, git_dir):
+        self.calls = [
+            dict(call, stdout=call['stdout'].replace(GIT_DIR_PLACEHOLDER, git_dir), used=False)
+            for call in calls
+        ]
+        self.latency_scale = latency_scale
+        self.metrics = metrics
+        self.lock = threading.Lock()
+
+    def __call__(self, args, **kwargs):
+        if kwargs.get('capture_output') and kwargs.get('stderr') is not None:
+            # Sama seperti subprocess.run asli
+            raise ValueError('stdout and stderr arguments may not be used with capture_output.')
+
+        args = [str(arg) for arg in args]
+        with self.lock:
+            self.metrics['subprocess_calls'] += 1
+            call = next((c for c in self.calls if not c['used'] and args_match(c['args'], args)), None)
+            if call is None:
+                # Command yang sama boleh dipakai ulang jika tidak ada rekaman lain yang tersisa
+                call = next((c for c in reversed(self.calls) if args_match(c['args'], args)), None)
+            if call is None:
+                self.metrics['unrecorded_calls'].append(" ".join(args))
+                call = {'stdout': '', 'stderr': 'perf: command tidak ada di rekaman', 'returncode': 128, 'latency': 0}
+            call['used'] = True
+
+        time.sleep(call.get('latency', 0) * self.latency_scale)
+        if kwargs.get('check') and call['returncode'] != 0:
+            raise subprocess.CalledProcessError(call['returncode'], args, call['stdout'], call['stderr'])
+        return subprocess.CompletedProcess(args, call['returncode'], call['stdout'], call['stderr'])
+
+class LLMReplayer:
+    """Pengganti `genai.GenerativeModel` yang mengembalikan respons rekaman secara berurutan."""
+
+    def __init__(self, responses, latency_scale, metrics):
+        self.responses = list(responses)
+        self.latency_scale = latency_scale
+        self.metrics = metrics
+        self.lock = threading.Lock()
+
+    def model_class(self):
+        replayer = self
+
+        class ReplayModel:
+            def __init__(self, model_name, *args, **kwargs):
+                self.model_name = model_name
+
+            def generate_content(self, prompt, *args, **kwargs):
+                with replayer.lock:
+                    replayer.metrics['llm_calls'] += 1
+                    replayer.metrics['prompt_tokens'] += estimate_tokens(prompt)
+                    index = next(
+                        (i for i, r in enumerate(replayer.responses) if r.get('match', '') in prompt),
+                        None
+                    )
+                    response = replayer.responses.pop(index) if index is not None else {'text': 'perf', 'latency': 0}
+                time.sleep(response.get('latency', 0) * replayer.latency_scale)
+                return _Response(response['text'])
+
+        return ReplayModel
+
+class _Response:
+    """Respons minimal yang meniru atribut `text` dari respons Gemini."""
+
+    def __init__(self, text):
+        self.text = text
+
+def install_phase_timers(metrics):
+    """Membungkus fungsi pipeline dengan pengukur waktu. Mengembalikan fungsi untuk mengembalikan aslinya."""
+    restores = []
+    for phase, (module_name, function_name) in PHASES.items():
+        module = sys.modules[module_name]
+        original = getattr(module, function_name)
+
+        def timed(*args, __original=original, __phase=phase, **kwargs):
+            started = time.perf_counter()
+            try:
+                return __original(*args, **kwargs)
+            finally:
+                elapsed = (time.perf_counter() - started) * 1000
+                metrics['phases'][__phase] = metrics['phases'].get(__phase, 0.0) + elapsed
+
+        setattr(module, function_name, timed)
+        restores.append((module, function_name, original))
+
+    def restore():
+        for module, function_name, original in restores:
+            setattr(module, function_name, original)
+    return restore
+
+def write_config(config_values, directory):
+    """Menulis konfigurasi workload ke file .conf sementara."""
+    path = os.path.join(directory, 'perf.conf')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("[settings]\n")
+        for key, value in config_values.items():
+            f.write(f"{key}={value}\n")
+    return path
+
+def run_script(module_name, argv):
+    """Menjalankan fungsi main() dari main.py atau hook.py dengan argv tertentu, menangkap SystemExit."""
+    module = sys.modules[module_name]
+    saved_argv = sys.argv
+    sys.argv = [f"{module_name}.py"] + argv
+    try:
+        module.main()
+    except SystemExit:
+        pass
+    finally:
+        sys.argv = saved_argv
+
+def run_entry(entry, argv, config_path, workdir):
+    """
+    Menjalankan entry point workload. Untuk hook, file pesan commit dibuat di `workdir`
+    dan `argv` berisi argumen sisanya dari Git (sumber pesan).
+    """
+    if entry == 'hook':
+        message_file = os.path.join(workdir, 'COMMIT_EDITMSG')
+        with open(message_file, 'w', encoding='utf-8') as f:
+            f.write("\n# Please enter the commit message for your changes.\n")
+        run_script('hook', [message_file] + argv + ['-c', config_path])
+    else:
+        run_script('main', ['-c', config_path] + argv)
+
+def recorded_args(args):
+    """Argumen command untuk rekaman; nilai yang dihasilkan model diganti wildcard '*'."""
+    args = [str(arg) for arg in args]
+    return [
+        '*' if index > 0 and args[index - 1] in GENERATED_VALUE_FLAGS else arg
+        for index, arg in enumerate(args)
+    ]
+
+def replay_workload(workload, latency_scale):
+    """Memutar ulang satu workload melalui main.py atau hook.py dan mengembalikan metriknya."""
+    import google.generativeai as genai
+    # Memastikan modul pipeline sudah dimuat sebelum dibungkus
+    import hook  # noqa: F401
+    import main  # noqa: F401
+
+    metrics = {
+        'total_ms': 0.0,
+        'phases': {},
+        'subprocess_calls': 0,
+        'llm_calls': 0,
+        'prompt_tokens': 0,
+        'peak_memory_kb': 0,
+        'unrecorded_calls': [],
+    }
+    inputs = list(workload.get('inputs', []))
+    which = workload.get('which', {})
+
+    workdir = tempfile.mkdtemp(prefix='acpr-perf-')
+    git_dir = os.path.join(workdir, '.git')
+    os.makedirs(git_dir)
+
+    saved = (subprocess.run, genai.GenerativeModel, genai.configure, builtins.input, shutil.which, os.getcwd())
+    subprocess.run = SubprocessReplayer(workload.get('subprocess', []), latency_scale, metrics, git_dir)
+    genai.GenerativeModel = LLMReplayer(workload.get('llm', []), latency_scale, metrics).model_class()
+    genai.configure = lambda **kwargs: None
+    builtins.input = lambda prompt='': inputs.pop(0) if inputs else 'n'
+    shutil.which = lambda name, *args, **kwargs: which.get(name, saved[4](name, *args, **kwargs))
+    os.environ.setdefault('GANAI_API_KEY', 'perf-replay')
+    restore_phases = install_phase_timers(metrics)
+
+    os.chdir(workdir)
+    config_path = write_config(workload.get('config', {}), workdir)
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        run_entry(workload.get('entry', 'main'), workload.get('argv', []), config_path, workdir)
+    finally:
+        metrics['total_ms'] = (time.perf_counter() - started) * 1000
+        metrics['peak_memory_kb'] = tracemalloc.get_traced_memory()[1] // 1024
+        tracemalloc.stop()
+        restore_phases()
+        subprocess.run, genai.GenerativeModel, genai.configure, builtins.input, shutil.which, cwd = saved
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    metrics['total_ms'] = round(metrics['total_ms'], 1)
+    metrics['phases'] = {name: round(ms, 1) for name, ms in metrics['phases'].items()}
+    return metrics
+
+def record_workload(name, entry, entry_argv, config_path, output_path):
+    """
+    Menjalankan main.py atau hook.py secara nyata sambil merekam command git/gh, respons LLM,
+    jawaban input, dan latensinya ke file workload.
+    """
+    import google.generativeai as genai
+    from lib import config
+    import hook  # noqa: F401
+    import main  # noqa: F401
+
+    workload = {
+        'name': name,
+        'entry': entry,
+        'argv': entry_argv,
+        'config': dict(config.load_app_config(config_path)),
+        'inputs': [],
+        'which': {'gh': 'gh' if shutil.which('gh') else None},
+        'subprocess': [],
+        'llm': [],
+        'budgets': {},
+    }
+    real_run, real_model, real_input = subprocess.run, genai.GenerativeModel, builtins.input
+    lock = threading.Lock()
+
+    def recording_run(args, **kwargs):
+        started = time.perf_counter()
+        error = None
+        try:
+            result = real_run(args, **kwargs)
+        except subprocess.CalledProcessError as e:
+            result, error = subprocess.CompletedProcess(e.cmd, e.returncode, e.stdout, e.stderr), e
+        latency = time.perf_counter() - started
+        stdout = result.stdout if isinstance(result.stdout, str) else ''
+        if [str(arg) for arg in args] == GIT_DIR_COMMAND and result.returncode == 0:
+            # File cache di .git (profil, perbandingan branch, state PR) dialihkan saat replay
+            stdout = GIT_DIR_PLACEHOLDER + '\n'
+        with lock:
+            workload['subprocess'].append({
+                'args': recorded_args(args),
+                'stdout': stdout,
+                'stderr': result.stderr if isinstance(result.stderr, str) else '',
+                'returncode': result.returncode,
+                'latency': round(latency, 4),
+            })
+        if error:
+            raise error
+        return result
+
+    class RecordingModel:
+        def __init__(self, model_name, *args, **kwargs):
+            self.model = real_model(model_name, *args, **kwargs)
+
+        def generate_content(self, prompt, *args, **kwargs):
+            started = time.perf_counter()
+            response = self.model.generate_content(prompt, *args, **kwargs)
+            with lock:
+                workload['llm'].append({
+                    'text': response.text,
+                    'latency': round(time.perf_counter() - started, 4),
+                })
+            return response
+
+    def recording_input(prompt=''):
+        answer = real_input(prompt)
+        workload['inputs'].append(answer)
+        return answer
+
+    subprocess.run, genai.GenerativeModel, builtins.input = recording_run, RecordingModel, recording_input
+    workdir = tempfile.mkdtemp(prefix='acpr-perf-record-')
+    try:
+        run_entry(entry, entry_argv, config_path, workdir)
+    finally:
+        subprocess.run, genai.GenerativeModel, builtins.input = real_run, real_model, real_input
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(workload, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+    print(f"💾 Workload '{name}' direkam ke: {output_path}")
+
+def exceeds(value, baseline, tolerance):
+    """Mengecek apakah nilai melewati baseline lebih dari toleransi relatif dan absolut."""
+    relative, absolute = tolerance
+    return value > baseline * (1 + relative) + absolute
+
+def compare_metrics(metrics, baseline, budgets):
+    """Membandingkan metrik dengan baseline dan budget. Mengembalikan daftar pesan kegagalan."""
+    failures = []
+    for metric, limit in budgets.items():
+        value = metrics['phases'].get(metric[len('phase:'):], 0) if metric.startswith('phase:') else metrics.get(metric)
+        if value is not None and value > limit:
+            failures.append(f"budget {metric}: {value} > {limit}")
+
+    if not baseline:
+        return failures
+    checks = [
+        ('total_ms', TIME_TOLERANCE),
+        ('subprocess_calls', COUNT_TOLERANCE),
+        ('llm_calls', COUNT_TOLERANCE),
+        ('prompt_tokens', TOKEN_TOLERANCE),
+        ('peak_memory_kb', MEMORY_TOLERANCE),
+    ]
+    for metric, tolerance in checks:
+        if metric in baseline and exceeds(metrics[metric], baseline[metric], tolerance):
+            failures.append(f"{metric}: {metrics[metric]} (baseline {baseline[metric]})")
+    for phase, baseline_ms in baseline.get('phases', {}).items():
+        value = metrics['phases'].get(phase, 0.0)
+        if exceeds(value, baseline_ms, TIME_TOLERANCE):
+            failures.append(f"phase {phase}: {value} ms (baseline {baseline_ms} ms)")
+    return failures
+
+def list_workloads(names):
+    """Mendapatkan path file workload yang dipilih (semua jika `names` kosong)."""
+    if not os.path.isdir(WORKLOADS_DIR):
+        return []
+    available = sorted(f[:-len('.json')] for f in os.listdir(WORKLOADS_DIR) if f.endswith('.json'))
+    selected = names or available
+    missing = [name for name in selected if name not in available]
+    if missing:
+        print(f"⚠️ Workload tidak ditemukan: {', '.join(missing)}")
+    return [os.path.join(WORKLOADS_DIR, f"{name}.json") for name in selected if name in available]
+
+def replay_in_subprocess(workload_path, latency_scale):
+    """Memutar ulang workload di proses Python terpisah agar state modul dan memori terisolasi."""
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '_replay', workload_path, '--latency-scale', str(latency_scale)],
+        capture_output=True, text=True, cwd=SCRIPT_DIR
+    )
+    if result.returncode != 0:
+        print(result.stdout[-2000:])
+        print(result.stderr[-2000:])
+        return None
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def command_run(args):
+    """Menjalankan semua workload, membandingkan dengan baseline, dan gagal jika budget terlampaui."""
+    if args.update_baseline and args.latency_scale != 1.0:
+        # Baseline harus memakai latensi rekaman asli agar run berikutnya sebanding
+        print("❌ --update-baseline tidak dapat digabung dengan --latency-scale selain 1.0.")
+        return 1
+
+    workload_paths = list_workloads(args.workloads)
+    if not workload_paths:
+        print("❌ Tidak ada workload untuk dijalankan.")
+        return 1
+
+    baselines = {}
+    if os.path.exists(BASELINES_PATH):
+        with open(BASELINES_PATH, 'r', encoding='utf-8') as f:
+            baselines = json.load(f)
+
+    failed = False
+    for path in workload_paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            workload = json.load(f)
+        name = workload['name']
+        metrics = replay_in_subprocess(path, args.latency_scale)
+        if metrics is None:
+            print(f"❌ {name}: replay gagal.")
+            failed = True
+            continue
+
+        phases = ", ".join(f"{phase}={ms:.0f}ms" for phase, ms in sorted(metrics['phases'].items()))
+        print(f"⏱️  {name}: total={metrics['total_ms']:.0f}ms subprocess={metrics['subprocess_calls']} "
+              f"llm={metrics['llm_calls']} tokens≈{metrics['prompt_tokens']} peak={metrics['peak_memory_kb']}KB")
+        print(f"   {phases}")
+        if metrics['unrecorded_calls']:
+            print(f"   ⚠️ {len(metrics['unrecorded_calls'])} command tidak ada di rekaman: {metrics['unrecorded_calls'][:3]}")
+
+        if args.update_baseline:
+            metrics.pop('unrecorded_calls')
+            baselines[name] = metrics
+            continue
+
+        failures = compare_metrics(metrics, baselines.get(name), workload.get('budgets', {}))
+        if failures:
+            failed = True
+            for failure in failures:
+                print(f"   ❌ {failure}")
+        else:
+            print("   ✅ Dalam budget dan baseline.")
+
+    if args.update_baseline:
+        os.makedirs(PERF_DIR, exist_ok=True)
+        with open(BASELINES_PATH, 'w', encoding='utf-8') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"💾 Baseline diperbarui: {BASELINES_PATH}")
+        return 0
+    return 1 if failed else 0
+
+def main():
+    """Entry point perintah perf: menjalankan, merekam, dan memperbarui baseline workload."""
+    parser = argparse.ArgumentParser(description="Gate regresi performa untuk Git ACPR Automatic Helper.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help="Putar ulang workload dan bandingkan dengan baseline.")
+    run_parser.add_argument('workloads', nargs='*', help="Nama workload (default: semua di perf/workloads).")
+    run_parser.add_argument('--latency-scale', type=float, default=1.0, help="Pengali latensi rekaman. Default: 1.0")
+    run_parser.add_argument('--update-baseline', action='store_true', help="Simpan hasil sebagai baseline baru.")
+
+    record_parser = subparsers.add_parser('record', help="Rekam workload dari eksekusi main.py yang nyata. Argumen main.py/hook.py ditulis setelah '--'.")
+    record_parser.add_argument('name', help="Nama workload.")
+    record_parser.add_argument('--entry', choices=ENTRIES, default='main', help="Entry point yang direkam. Default: main")
+    record_parser.add_argument('-c', '--config', default=os.path.join(SCRIPT_DIR, 'conf', 'git_acp.conf'), help="Path ke file konfigurasi.")
+
+    replay_parser = subparsers.add_parser('_replay')
+    replay_parser.add_argument('workload')
+    replay_parser.add_argument('--latency-scale', type=float, default=1.0)
+
+    # Argumen setelah '--' diteruskan apa adanya ke main.py/hook.py saat merekam
+    argv = sys.argv[1:]
+    entry_args = argv[argv.index('--') + 1:] if '--' in argv else []
+    args = parser.parse_args(argv[:argv.index('--')] if '--' in argv else argv)
+    if args.command == 'run':
+        sys.exit(command_run(args))
+    if args.command == 'record':
+        record_workload(args.name, args.entry, entry_args, args.config, os.path.join(WORKLOADS_DIR, f"{args.name}.json"))
+        return
+    if args.command == '_replay':
+        sys.path.insert(0, SCRIPT_DIR)
+        with open(args.workload, 'r', encoding='utf-8') as f:
+            workload = json.load(f)
+        metrics = replay_workload(workload, args.latency_scale)
+        # Baris terakhir stdout berisi metrik dalam format JSON
+        print(json.dumps(metrics))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+from lib import diff_cluster, diff_model
+
+
+def file_diff(path, removed, added, context="    pass"):
+    return (
+        f"diff --git a/{path} b/{path}\n"
+        f"--- a/{path}\n"
+        f"+++ b/{path}\n"
+        "@@ -1,2 +1,2 @@\n"
+        f"-{removed}\n"
+        f"+{added}\n"
+        f" {context}\n"
+    )
+
+
+def cluster_sizes(diff):
+    parsed = diff_model.parse_diff(diff)
+    return sorted(len(members) for members in diff_cluster.cluster_hunks(parsed).values())
+
+
+def test_import_rename_across_files_is_one_cluster():
+    diff = "".join(
+        file_diff(f"app/mod_{i}.py", "from app.helpers import load", "from app.utils import load")
+        for i in range(5)
+    )
+    assert cluster_sizes(diff) == [5]
+
+
+def test_version_bump_is_one_cluster():
+    diff = "".join(
+        file_diff(f"pkg_{i}/setup.cfg", f"version = 1.{i}.0", f"version = 1.{i}.1")
+        for i in range(3)
+    )
+    assert cluster_sizes(diff) == [3]
+
+
+def test_same_delta_in_different_statement_is_not_merged():
+    diff = (
+        file_diff("app/a.py", "from app import old_name", "from app import new_name")
+        + file_diff("app/b.py", "from app import old_name", "from app import new_name")
+        + file_diff("app/other.py", "    return old_name(request)", "    return new_name(request)")
+    )
+    assert cluster_sizes(diff) == [1, 2]
+
+
+def test_compact_diff_keeps_unclustered_hunk_content():
+    diff = "".join(
+        file_diff(f"app/mod_{i}.py", "from app import old_name", "from app import new_name")
+        for i in range(20)
+    ) + file_diff("app/other.py", "    return old_name(request)", "    return new_name(request)")
+    compacted = diff_cluster.compact_diff(diff)
+    assert len(compacted) < len(diff)
+    assert "+    return new_name(request)" in compacted
+    assert "# [cluster] Perubahan yang sama juga ada di 19 hunk lain pada 19 file" in compacted
+
+
+def test_compact_diff_returns_original_without_clusters():
+    diff = file_diff("app/a.py", "x = 1", "x = 2")
+    assert diff_cluster.compact_diff(diff) == diff
@@ -0,0 +1,142 @@
+from lib import diff_model
+
+MODIFIED = (
+    "diff --git a/app/views.py b/app/views.py\n"
+    "index 1111111..2222222 100644\n"
+    "--- a/app/views.py\n"
+    "+++ b/app/views.py\n"
+    "@@ -1,3 +1,3 @@\n"
+    " import os\n"
+    "-from app.helpers import load\n"
+    "+from app.utils import load\n"
+    " \n"
+    "@@ -10,2 +10,3 @@ def view():\n"
+    "     return load()\n"
+    "+\n"
+)
+
+RENAMED = (
+    "diff --git a/old/name.py b/new/name.py\n"
+    "similarity index 100%\n"
+    "rename from old/name.py\n"
+    "rename to new/name.py\n"
+)
+
+BINARY = (
+    "diff --git a/logo.png b/logo.png\n"
+    "new file mode 100644\n"
+    "index 0000000..3333333\n"
+    "Binary files /dev/null and b/logo.png differ\n"
+)
+
+SQL_COMMENTS = (
+    "diff --git a/schema.sql b/schema.sql\n"
+    "index 4444444..5555555 100644\n"
+    "--- a/schema.sql\n"
+    "+++ b/schema.sql\n"
+    "@@ -1,2 +1,2 @@\n"
+    "--- old comment\n"
+    "+++ new comment\n"
+    " select 1;\n"
+)
+
+
+def test_counts_hunks_and_lines():
+    parsed = diff_model.parse_diff(MODIFIED)
+    [diff_file] = parsed.files
+    assert diff_file.path == "app/views.py"
+    assert diff_file.status == "M"
+    assert len(diff_file.hunks) == 2
+    assert (diff_file.added, diff_file.deleted) == (2, 1)
+    assert (parsed.added, parsed.deleted) == (2, 1)
+    assert list(parsed.added_lines(diff_file)) == ["+from app.utils import load", "+"]
+
+
+def test_offsets_reproduce_original_text():
+    text = MODIFIED + RENAMED + BINARY
+    parsed = diff_model.parse_diff(text)
+    rebuilt = "".join(
+        parsed.header_text(f) + "".join(parsed.hunk_text(h) for h in f.hunks) for f in parsed.files
+    )
+    assert rebuilt == text
+    assert str(parsed) == text
+
+
+def test_rename_without_hunks():
+    parsed = diff_model.parse_diff(RENAMED + MODIFIED)
+    renamed = parsed.files[0]
+    assert renamed.status == "R"
+    assert (renamed.old_path, renamed.path) == ("old/name.py", "new/name.py")
+    assert renamed.hunks == []
+    # Header file tanpa hunk berakhir tepat di awal file berikutnya
+    assert parsed.header_text(renamed) == RENAMED
+    assert parsed.paths() == ["new/name.py", "app/views.py"]
+
+
+def test_binary_file():
+    parsed = diff_model.parse_diff(BINARY)
+    [diff_file] = parsed.files
+    assert diff_file.status == "A"
+    assert diff_file.binary
+    assert (diff_file.added, diff_file.deleted) == (0, 0)
+
+
+def test_content_lines_starting_with_diff_markers_inside_hunk():
+    parsed = diff_model.parse_diff(SQL_COMMENTS)
+    [diff_file] = parsed.files
+    assert diff_file.path == "schema.sql"
+    assert (diff_file.added, diff_file.deleted) == (1, 1)
+    assert parsed.hunk_lines(diff_file.hunks[0])[1:] == ["--- old comment", "+++ new comment", " select 1;"]
+
+
+def test_no_trailing_newline():
+    text = MODIFIED.rstrip("\n")
+    parsed = diff_model.parse_diff(text)
+    [diff_file] = parsed.files
+    assert diff_file.end == len(text)
+    assert diff_file.hunks[-1].end == len(text)
+    assert (diff_file.added, diff_file.deleted) == (2, 1)
+    assert parsed.hunk_text(diff_file.hunks[-1]).endswith("+")
+
+
+def test_no_newline_at_end_of_file_marker_is_not_counted():
+    text = MODIFIED + "\\ No newline at end of file\n"
+    parsed = diff_model.parse_diff(text)
+    assert (parsed.files[0].added, parsed.files[0].deleted) == (2, 1)
+
+
+def test_empty_diff_and_as_parsed():
+    parsed = diff_model.parse_diff("")
+    assert not parsed
+    assert parsed.files == []
+    assert diff_model.as_parsed(parsed) is parsed
+    assert diff_model.as_parsed(None).text == ""
+
+
+def test_quoted_non_ascii_path():
+    text = (
+        'diff --git "a/docs/caf\\303\\251.py" "b/docs/caf\\303\\251.py"\n'
+        "index 1111111..2222222 100644\n"
+        '--- "a/docs/caf\\303\\251.py"\n'
+        '+++ "b/docs/caf\\303\\251.py"\n'
+        "@@ -1 +1 @@\n"
+        "-old\n"
+        "+new\n"
+    )
+    [diff_file] = diff_model.parse_diff(text).files
+    assert diff_file.path == "docs/café.py"
+    assert diff_file.old_path == "docs/café.py"
+    assert (diff_file.added, diff_file.deleted) == (1, 1)
+
+
+def test_quoted_rename_with_space_and_tab():
+    text = (
+        'diff --git a/old name.py "b/new\\tname.py"\n'
+        "similarity index 100%\n"
+        "rename from old name.py\n"
+        'rename to "new\\tname.py"\n'
+    )
+    [diff_file] = diff_model.parse_diff(text).files
+    assert diff_file.status == "R"
+    assert diff_file.old_path == "old name.py"
+    assert diff_file.path == "new\tname.py"
@@ -0,0 +1,69 @@
+from lib import local_commit
+
+
+def file_diff(path, lines, status="modified"):
+    header = f"diff --git a/{path} b/{path}\n"
+    if status == "new":
+        header += "new file mode 100644\n--- /dev/null\n"
+    else:
+        header += f"--- a/{path}\n"
+    header += f"+++ b/{path}\n@@ -1,1 +1,{len(lines)} @@\n"
+    return header + "".join(f"{line}\n" for line in lines)
+
+
+def test_new_function_is_feat_with_scope():
+    diff = file_diff("lib/parser.py", ["+def parse_header(text):", "+    return text"])
+    assert local_commit.generate_local_commit_message(diff) == "feat(parser): add parse_header"
+
+
+def test_scope_kept_when_only_a_substring_of_description():
+    diff = file_diff("lib/app.py", ["+def apply_patch(text):", "+    return text"])
+    assert local_commit.generate_local_commit_message(diff) == "feat(app): add apply_patch"
+    diff = file_diff("lib/io.py", ["+def ratio(a, b):", "+    return a / b"])
+    assert local_commit.generate_local_commit_message(diff) == "feat(io): add ratio"
+
+
+def test_scope_dropped_when_it_is_the_subject_file():
+    diff = file_diff("lib/parser.py", ["+import logging"])
+    assert local_commit.generate_local_commit_message(diff) == "refactor: update parser.py"
+
+
+def test_plain_code_update_is_not_feat():
+    diff = file_diff("lib/parser.py", ["+import logging"]) + file_diff("lib/reader.py", ["+import logging"])
+    assert local_commit.generate_local_commit_message(diff) == "refactor(lib): update 2 files"
+
+
+def test_fix_hint_in_code():
+    diff = file_diff("lib/parser.py", ["-    return text", "+    raise ValueError(text)"])
+    assert local_commit.generate_local_commit_message(diff) == "fix: fix handling in parser.py"
+
+
+def test_tests_only():
+    diff = file_diff("tests/test_parser.py", ["+def test_parse():", "+    pass"], status="new")
+    assert local_commit.generate_local_commit_message(diff) == "test: add tests for test_parser.py"
+
+
+def test_new_test_and_readme_is_test_not_chore():
+    diff = (
+        file_diff("tests/test_parser.py", ["+def test_parse():", "+    pass"], status="new")
+        + file_diff("README.md", ["+Run the tests with pytest."])
+    )
+    assert local_commit.generate_local_commit_message(diff).startswith("test:")
+
+
+def test_docs_dominant_mix_is_docs():
+    diff = (
+        file_diff("docs/usage.md", ["+usage"])
+        + file_diff("docs/setup.md", ["+setup"])
+        + file_diff("tests/test_parser.py", ["+    pass"])
+    )
+    assert local_commit.generate_local_commit_message(diff).startswith("docs:")
+
+
+def test_config_only_is_chore():
+    diff = file_diff("conf/git_acp.conf", ["+fast=false"])
+    assert local_commit.generate_local_commit_message(diff).startswith("chore")
+
+
+def test_empty_diff():
+    assert local_commit.generate_local_commit_message("") is None